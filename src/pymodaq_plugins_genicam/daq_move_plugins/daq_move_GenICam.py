@@ -0,0 +1,173 @@
+from pymodaq.control_modules.move_utility_classes import DAQ_Move_base, comon_parameters_fun, main, \
+    DataActuatorType
+from pymodaq_utils.utils import ThreadCommand
+from pymodaq.utils.data import DataActuator
+
+from harvesters.core import ImageAcquirer
+
+from pymodaq_plugins_genicam.hardware.nodes import EInterfaceType, write_feature
+from pymodaq_plugins_genicam.hardware.discovery import devices_names, create_acquirer
+
+
+class DAQ_Move_GenICam(DAQ_Move_base):
+    """ Instrument plugin class for an actuator driving a numerical feature of a GenICam camera
+
+    Any integer or float node of the remote device (ExposureTime, Gain, OffsetX...) can be used as
+    an actuator, eventually indexed by a selector (GainSelector...). In Slave mode the
+    ImageAcquirer of the GenICam viewer is shared so that feature scans are done on the running
+    camera with direct node writes and read back.
+
+    Attributes:
+    -----------
+    controller: ImageAcquirer
+        The harvesters object giving access to the camera node map
+    """
+    _controller_units = ''
+    is_multiaxes = False
+    _axis_names = ['Feature']
+    _epsilon = 0.001
+    data_actuator_type = DataActuatorType['DataActuator']
+
+    params = [
+                 {'title': 'Cam. names:', 'name': 'cam_name', 'type': 'list', 'limits': devices_names},
+                 {'title': 'Feature:', 'name': 'feature', 'type': 'str', 'value': 'ExposureTime',
+                  'tip': 'Name of the numerical node to be used as actuator'},
+                 {'title': 'Selector:', 'name': 'selector', 'type': 'str', 'value': '',
+                  'tip': 'Name of the selector node indexing the feature, e.g. GainSelector'},
+                 {'title': 'Selector value:', 'name': 'selector_value', 'type': 'str', 'value': ''},
+             ] + comon_parameters_fun(is_multiaxes, axis_names=_axis_names, epsilon=_epsilon)
+
+    def ini_attributes(self):
+        self.controller: ImageAcquirer = None
+        self.feature = None
+        self.selector = None
+        self.home_value = None
+
+    def select(self):
+        """Set the selector node so that the feature node points to the right entry, the selector
+        is only written if it points to another one (in Slave mode the viewer may use it too)"""
+        if self.selector is not None and \
+                self.selector.to_string() != self.settings.child('selector_value').value():
+            self.selector.from_string(self.settings.child('selector_value').value())
+
+    def set_feature(self):
+        """Get (and keep) the feature and selector nodes from their names in the settings"""
+        node_map = self.controller.remote_device.node_map
+        if self.settings.child('selector').value() != '':
+            self.selector = node_map.get_node(self.settings.child('selector').value())
+        else:
+            self.selector = None
+        self.select()
+        self.feature = node_map.get_node(self.settings.child('feature').value())
+
+    def set_feature_limits(self):
+        """Get the units, bounds and resolution of the actuator from the node map"""
+        self.set_feature()
+        feature = self.feature
+        interface_type = feature.node.principal_interface_type
+        if interface_type not in [EInterfaceType.intfIInteger.value, EInterfaceType.intfIFloat.value]:
+            raise TypeError(f'The feature {feature.node.name} is not a numerical one')
+        try:
+            units = feature.unit
+        except Exception:
+            units = ''
+        self.settings.child('units').setValue(units)
+        self.settings.child('bounds', 'min_bound').setValue(feature.min)
+        self.settings.child('bounds', 'max_bound').setValue(feature.max)
+        self.settings.child('bounds', 'is_bounds').setValue(True)
+        if interface_type == EInterfaceType.intfIInteger.value:
+            self.settings.child('epsilon').setValue(feature.inc / 2)
+        self.home_value = feature.value
+
+    def get_actuator_value(self):
+        """Get the current value read back from the node"""
+        pos = DataActuator(data=self.feature.value)
+        pos = self.get_position_with_scaling(pos)
+        return pos
+
+    def close(self):
+        """Terminate the communication protocol"""
+        if self.is_master:
+            self.controller.destroy()
+
+    def commit_settings(self, param):
+        """Apply the consequences of a change of value in the actuator settings
+
+        Parameters
+        ----------
+        param: Parameter
+            A given parameter (within actuator_settings) whose value has been changed by the user
+        """
+        if param.name() in ['feature', 'selector', 'selector_value']:
+            try:
+                self.set_feature_limits()
+                self.emit_value(self.get_actuator_value())
+            except Exception as e:
+                self.emit_status(ThreadCommand('Update_Status', [f'Invalid feature: {e}', 'log']))
+
+    def ini_stage(self, controller=None):
+        """Actuator communication initialization
+
+        Parameters
+        ----------
+        controller: (object)
+            custom object of a PyMoDAQ plugin (Slave case). None if only one actuator by controller (Master case)
+
+        Returns
+        -------
+        info: str
+        initialized: bool
+            False if initialization failed otherwise True
+        """
+        if self.is_master:
+            controller = create_acquirer(self.settings.child('cam_name').value())
+        self.ini_stage_init(old_controller=controller, new_controller=controller)
+
+        self.set_feature_limits()
+
+        info = f"Actuator on {self.settings.child('feature').value()}"
+        initialized = True
+        return info, initialized
+
+    def write(self, value):
+        """Write the value into the node and use the read back one as the target so that the move
+        is done as soon as the node is set, even if the device coerced the value"""
+        self.select()
+        write_feature(self.controller, self.settings.child('feature').value(), value)
+        self.target_value = self.get_actuator_value()
+
+    def move_abs(self, value: DataActuator):
+        """ Move the actuator to the absolute target defined by value
+
+        Parameters
+        ----------
+        value: (float) value of the absolute target positioning
+        """
+        value = self.check_bound(value)
+        self.target_value = value
+        value = self.set_position_with_scaling(value)
+        self.write(value.value())
+
+    def move_rel(self, value: DataActuator):
+        """ Move the actuator to the relative target actuator value defined by value
+
+        Parameters
+        ----------
+        value: (float) value of the relative target positioning
+        """
+        value = self.check_bound(self.current_value + value) - self.current_value
+        self.target_value = value + self.current_value
+        self.write(self.set_position_with_scaling(self.target_value).value())
+
+    def move_home(self):
+        """Set the feature back to the value it had at initialization"""
+        self.write(self.home_value)
+        self.move_done()
+
+    def stop_motion(self):
+        """Node writes are immediate, nothing to stop"""
+        self.move_done()
+
+
+if __name__ == '__main__':
+    main(__file__, init=True)
@@ -1,56 +1,44 @@
+import time
+from collections import deque
+
 import numpy as np
 
 from qtpy import QtWidgets, QtCore
 
-from pymodaq_utils.utils import ThreadCommand, recursive_find_files_extension
+from pymodaq_utils.utils import ThreadCommand
 from pymodaq.utils.data import DataFromPlugins, Axis, DataToExport
 from pymodaq.control_modules.viewer_utility_classes import DAQ_Viewer_base, comon_parameters, main
 from pymodaq.utils.parameter import Parameter
 from pymodaq.utils.parameter import utils as putils
-from pymodaq.utils.enums import BaseEnum
 from pymodaq.utils.gui_utils import select_file, ListPicker
 from pymodaq_gui.parameter.utils import set_param_from_param
 
-from harvesters.core import Harvester, ImageAcquirer, Callback
+from harvesters.core import ImageAcquirer, Callback
 from harvesters.util.pfnc import mono_location_formats, \
     rgb_formats, bgr_formats, \
     rgba_formats, bgra_formats
 
-try:
-    cti_paths = recursive_find_files_extension(r'C:\Program Files\MATRIX VISION\mvIMPACT Acquire\bin\x64', 'cti')
-except:
-    try:
-        cti_paths = recursive_find_files_extension(r'C:\Program Files\Teledyne\Spinnaker\cti64\vs2015', 'cti')
-    except:
-        cti_paths = []
-
-
-class EInterfaceType(BaseEnum):
-    """
-    typedef for interface type
-    """
-    intfIValue = 0       #: IValue interface
-    intfIBase = 1        #: IBase interface
-    intfIInteger = 2     #: IInteger interface
-    intfIBoolean = 3     #: IBoolean interface
-    intfICommand = 4     #: ICommand interface
-    intfIFloat = 5       #: IFloat interface
-    intfIString = 6      #: IString interface
-    intfIRegister = 7    #: IRegister interface
-    intfICategory = 8    #: ICategory interface
-    intfIEnumeration = 9  #: IEnumeration interface
-    intfIEnumEntry = 10   #: IEnumEntry interface
-    intfIPort = 11  #: IPort interface
-
-
-harv = Harvester()
-
-
-for path in cti_paths:
-    harv.add_cti_file(path)
-    harv.update_device_info_list()
-devices = harv.device_info_list
-devices_names = [device.model for device in devices]
+from pymodaq_plugins_genicam.hardware.discovery import cti_paths, devices_names, device_scanner, \
+    add_cti_file, create_acquirer
+from pymodaq_plugins_genicam.hardware.nodes import EInterfaceType
+from pymodaq_plugins_genicam.hardware.feature_writer import FeatureWriter
+from pymodaq_plugins_genicam.hardware.scan_sync import FramePositionMapper, SYNC_MODES
+from pymodaq_plugins_genicam.hardware.analysis import AnalysisPipeline, ANALYSES, BACK_PRESSURE_POLICIES
+from pymodaq_plugins_genicam.hardware.preview import PreviewMaker
+from pymodaq_plugins_genicam.hardware.transport import tune_gige_transport, StreamStatistics, \
+    STREAM_STATISTICS_NODES, get_node, is_gige
+from pymodaq_plugins_genicam.hardware.display import DisplayLUT, DISPLAY_CURVES, get_bit_depth, \
+    get_frame_dtype
+from pymodaq_plugins_genicam.hardware.governor import FrameRateGovernor
+from pymodaq_plugins_genicam.hardware.hdr import HDRMerger, ExposureBracket, parse_exposures
+from pymodaq_plugins_genicam.hardware.snapshots import list_snapshots, get_user_sets, save_snapshot, \
+    load_snapshot, write_features
+
+# exported frames that may still wait in the GUI queue when their buffer is filled again
+FRAME_RING_SIZE = 4
+# a hardware-timed scan is ended when no frame came for this many frame periods plus the margin (s)
+SCAN_TIMEOUT_PERIODS = 5
+SCAN_TIMEOUT_MARGIN = 1.
 
 
 class DAQ_2DViewer_GenICam(DAQ_Viewer_base):
@@ -72,11 +60,115 @@ class DAQ_2DViewer_GenICam(DAQ_Viewer_base):
                   'limits': devices_names},
                  {'title': 'Update features:', 'name': 'update_features', 'type': 'bool_push',
                   'value': False},
+                 {'title': 'Hardware-timed scan:', 'name': 'hw_scan', 'type': 'group', 'children': [
+                     {'title': 'Enabled:', 'name': 'hw_scan_enabled', 'type': 'bool', 'value': False,
+                      'tip': 'Grab a full scan in one go while the actuator moves continuously'},
+                     {'title': 'Sync. mode:', 'name': 'sync_mode', 'type': 'list', 'limits': SYNC_MODES,
+                      'value': 'counter',
+                      'tip': 'counter: one trigger per position, timestamp: started by the actuator then '
+                             'free run at constant velocity'},
+                     {'title': 'Start:', 'name': 'scan_start', 'type': 'float', 'value': 0.},
+                     {'title': 'Stop:', 'name': 'scan_stop', 'type': 'float', 'value': 1.},
+                     {'title': 'N positions:', 'name': 'scan_npts', 'type': 'int', 'value': 100, 'min': 1},
+                     {'title': 'Velocity (unit/s):', 'name': 'scan_velocity', 'type': 'float', 'value': 1.},
+                     {'title': 'Units:', 'name': 'scan_units', 'type': 'str', 'value': ''},
+                     {'title': 'Trigger source:', 'name': 'trigger_source', 'type': 'str', 'value': 'Line0',
+                      'tip': 'Input line receiving the actuator triggers: one per position (counter mode) '
+                             'or one at the start of the motion (timestamp mode)'},
+                     {'title': 'Missing frames:', 'name': 'scan_missing', 'type': 'int', 'value': 0,
+                      'readonly': True},
+                 ]},
+                 {'title': 'Frame analysis:', 'name': 'analysis', 'type': 'group', 'children': [
+                     {'title': 'Enabled:', 'name': 'analysis_enabled', 'type': 'bool', 'value': False},
+                     {'title': 'Function:', 'name': 'analysis_function', 'type': 'list',
+                      'limits': list(ANALYSES.keys()), 'value': 'Peak'},
+                     {'title': 'Custom function:', 'name': 'analysis_custom', 'type': 'str', 'value': '',
+                      'tip': 'package.module:function, used instead of the function above if set'},
+                     {'title': 'N workers:', 'name': 'analysis_workers', 'type': 'int', 'value': 2, 'min': 1},
+                     {'title': 'When behind:', 'name': 'analysis_policy', 'type': 'list',
+                      'limits': BACK_PRESSURE_POLICIES, 'value': 'skip',
+                      'tip': 'skip: drop frames from the analysis, block: wait for the workers'},
+                     {'title': 'Skipped frames:', 'name': 'analysis_skipped', 'type': 'int', 'value': 0,
+                      'readonly': True},
+                 ]},
+                 {'title': 'Dashboard preview:', 'name': 'preview', 'type': 'group', 'children': [
+                     {'title': 'Enabled:', 'name': 'preview_enabled', 'type': 'bool', 'value': False,
+                      'tip': 'Publish downsampled previews to the GenICam dashboard extension'},
+                     {'title': 'Max size (pxls):', 'name': 'preview_size', 'type': 'int', 'value': 256,
+                      'min': 16},
+                     {'title': 'Max rate (Hz):', 'name': 'preview_rate', 'type': 'float', 'value': 10.,
+                      'min': 0.1},
+                 ]},
+                 {'title': 'Display conversion:', 'name': 'display', 'type': 'group', 'children': [
+                     {'title': 'Enabled:', 'name': 'display_enabled', 'type': 'bool', 'value': False,
+                      'tip': 'Display high bit depth mono frames as 8 bits images converted with a lookup '
+                             'table, the full precision frames are still saved'},
+                     {'title': 'Curve:', 'name': 'display_curve', 'type': 'list', 'limits': DISPLAY_CURVES,
+                      'value': 'linear'},
+                     {'title': 'Gamma:', 'name': 'display_gamma', 'type': 'float', 'value': 0.5, 'min': 0.01},
+                     {'title': 'Auto levels:', 'name': 'auto_levels', 'type': 'bool', 'value': True},
+                     {'title': 'Low level:', 'name': 'display_low', 'type': 'int', 'value': 0, 'min': 0},
+                     {'title': 'High level (0: max):', 'name': 'display_high', 'type': 'int', 'value': 0,
+                      'min': 0},
+                 ]},
+                 {'title': 'HDR:', 'name': 'hdr', 'type': 'group', 'children': [
+                     {'title': 'Enabled:', 'name': 'hdr_enabled', 'type': 'bool', 'value': False,
+                      'tip': 'Cycle the exposure time and emit only the merged radiance frames'},
+                     {'title': 'Exposures (µs):', 'name': 'hdr_exposures', 'type': 'str',
+                      'value': '100, 1000, 10000'},
+                     {'title': 'Saturation (0: auto):', 'name': 'hdr_saturation', 'type': 'int', 'value': 0,
+                      'min': 0, 'tip': 'Saturation level of the pixels, from the pixel format bit depth if 0'},
+                     {'title': 'Bracket mode:', 'name': 'hdr_mode', 'type': 'str', 'value': '',
+                      'readonly': True},
+                 ]},
+                 {'title': 'GigE transport:', 'name': 'transport', 'type': 'group', 'children': [
+                     {'title': 'Auto tune at init:', 'name': 'auto_tune', 'type': 'bool', 'value': True,
+                      'tip': 'Probe the largest packet size and limit the throughput of GigE cameras'},
+                     {'title': 'Link usage:', 'name': 'link_usage', 'type': 'float', 'value': 0.9,
+                      'min': 0.1, 'max': 1., 'tip': 'Fraction of the link bandwidth the camera can use'},
+                     {'title': 'Tune now:', 'name': 'tune', 'type': 'bool_push', 'value': False},
+                     {'title': 'Packet size (B):', 'name': 'packet_size', 'type': 'int', 'value': 0,
+                      'readonly': True},
+                     {'title': 'Throughput (MB/s):', 'name': 'throughput', 'type': 'float', 'value': 0.,
+                      'readonly': True},
+                 ]},
+                 {'title': 'Frame rate governor:', 'name': 'governor', 'type': 'group', 'children': [
+                     {'title': 'Enabled:', 'name': 'governor_enabled', 'type': 'bool', 'value': False,
+                      'tip': 'Limit the frame rate of the camera to what the acquisition pipeline can process'},
+                     {'title': 'Headroom:', 'name': 'headroom', 'type': 'float', 'value': 0.8, 'min': 0.1,
+                      'max': 1., 'tip': 'Fraction of the processing capacity the camera may use'},
+                     {'title': 'Max rate (Hz, 0: device):', 'name': 'max_rate', 'type': 'float', 'value': 0.,
+                      'min': 0.},
+                     {'title': 'Processing (ms):', 'name': 'processing_time', 'type': 'float', 'value': 0.,
+                      'readonly': True},
+                     {'title': 'Sustainable rate (Hz):', 'name': 'sustainable_rate', 'type': 'float',
+                      'value': 0., 'readonly': True},
+                     {'title': 'Frame rate (Hz):', 'name': 'frame_rate', 'type': 'float', 'value': 0.,
+                      'readonly': True},
+                 ]},
+                 {'title': 'Stream statistics:', 'name': 'stream_stats', 'type': 'group', 'children': [
+                     {'title': f'{key.capitalize()}:', 'name': key, 'type': 'int', 'value': 0, 'readonly': True}
+                     for key in STREAM_STATISTICS_NODES]},
+                 {'title': 'Config. snapshots:', 'name': 'snapshots', 'type': 'group', 'children': [
+                     {'title': 'Name:', 'name': 'snapshot_name', 'type': 'str', 'value': 'preset'},
+                     {'title': 'Device user set:', 'name': 'user_set', 'type': 'list', 'limits': ['None'],
+                      'value': 'None', 'tip': 'Also save the configuration into this user set of the camera, '
+                                              'it is then restored in a single operation'},
+                     {'title': 'Save:', 'name': 'save_snapshot', 'type': 'bool_push', 'value': False},
+                     {'title': 'Snapshots:', 'name': 'snapshot_list', 'type': 'list',
+                      'limits': list_snapshots()},
+                     {'title': 'Restore:', 'name': 'load_snapshot', 'type': 'bool_push', 'value': False},
+                     {'title': 'Restored with:', 'name': 'snapshot_method', 'type': 'str', 'value': '',
+                      'readonly': True},
+                 ]},
                  {'title': 'Cam. Prop.:', 'name': 'cam_settings', 'type': 'group', 'children': []},
               ]
 
     def ini_attributes(self):
         self.controller: ImageAcquirer = None
+        self.feature_writer: FeatureWriter = None
+        self.stream_statistics: StreamStatistics = None
+        self.statistics_timer: QtCore.QTimer = None
 
         self.x_axis: Axis = None
         self.y_axis: Axis = None
@@ -86,6 +178,32 @@ class DAQ_2DViewer_GenICam(DAQ_Viewer_base):
         self.height = None
         self.height_max = None
         self.data = None
+        self.dte: DataToExport = None
+        self._data_key: tuple = None
+        self._frame_ring: list = []  # preallocated frame buffers, each frame is exported in the next one
+        self._display_ring: list = []
+        self._ring_index = 0
+
+        self.scan_mapper: FramePositionMapper = None
+        self.scan_watchdog: QtCore.QTimer = None  # ends a scan whose last frames never come
+        self._scan_triggers_set = False
+        self.scan_data: np.ndarray = None
+        self._frame_counter = 0
+
+        self.preview_maker: PreviewMaker = None
+
+        self.analysis_pipeline: AnalysisPipeline = None
+        self.analysis_frame_ids: deque = None  # ids of the frames submitted to the analysis, in order
+        self.analysis_values: list = None  # latest result and the id of its frame, exported with the frames
+
+        self.display_lut: DisplayLUT = None
+        self.display_data: np.ndarray = None
+
+        self.hdr_bracket: ExposureBracket = None
+        self.hdr_merger: HDRMerger = None
+        self.hdr_watchdog: QtCore.QTimer = None  # re-triggers the pending frame if it never comes
+
+        self.governor: FrameRateGovernor = None
 
     def commit_settings(self, param: Parameter):
         """Apply the consequences of a change of value in the detector settings
@@ -96,27 +214,47 @@ class DAQ_2DViewer_GenICam(DAQ_Viewer_base):
             A given parameter (within detector_settings) whose value has been changed by the user
         """
         if param.name() in putils.iter_children(self.settings.child('cam_settings'), []):
+            self.feature_writer.request(param.name(), param.value())
 
-            self.stop()
-            while self.controller.is_acquiring():
+        elif param.name() in putils.iter_children(self.settings.child('hw_scan'), []):
+            if param.name() != 'scan_missing':
                 self.stop()
-                QtWidgets.QApplication.processEvents()
+                self.set_hardware_scan()
 
-            feature = self.controller.remote_device.node_map.get_node(param.name())
-            interface_type = feature.node.principal_interface_type
-            if interface_type == EInterfaceType.intfIInteger.value:
-                val = int((param.value() // param.opts['step']) * param.opts['step'])
-            else:
-                val = param.value()
-            feature.value = val  # set the desired value
-            param.setValue(feature.value)  # retrieve the actually set one
+        elif param.name() in putils.iter_children(self.settings.child('analysis'), []):
+            if param.name() != 'analysis_skipped':
+                self.set_analysis()
+
+        elif param.name() in putils.iter_children(self.settings.child('preview'), []):
+            self.set_preview()
+
+        elif param.name() in putils.iter_children(self.settings.child('display'), []):
+            self.set_display()
+
+        elif param.name() in putils.iter_children(self.settings.child('hdr'), []):
+            if param.name() != 'hdr_mode':
+                self.stop()
+                self.set_hdr()
 
-            if param.name() in ['Height', 'Width', 'OffsetX', 'OffsetY']:
-                    self.width = self.controller.remote_device.node_map.get_node('Width').value
-                    self.height = self.controller.remote_device.node_map.get_node('Height').value
-                    self.get_yaxis()
-                    self.get_xaxis()
-                    self.data = np.zeros((self.height, self.width))
+        elif param.name() in putils.iter_children(self.settings.child('governor'), []):
+            if param.name() in ['governor_enabled', 'headroom', 'max_rate']:
+                self.set_governor()
+
+        elif param.name() == 'tune':
+            if param.value():
+                self.stop()
+                self.tune_transport()
+                param.setValue(False)
+
+        elif param.name() == 'save_snapshot':
+            if param.value():
+                self.save_config_snapshot()
+                param.setValue(False)
+
+        elif param.name() == 'load_snapshot':
+            if param.value():
+                self.restore_config_snapshot()
+                param.setValue(False)
 
         elif param.name() == "update_features":
             if param.value():
@@ -132,6 +270,201 @@ class DAQ_2DViewer_GenICam(DAQ_Viewer_base):
         #
         #     self.set_ROI()
 
+    def update_feature_value(self, name: str, value):
+        """Display the value actually set into a node by the feature writer"""
+        param = putils.get_param_from_name(self.settings.child('cam_settings'), name)
+        if param is not None:
+            param.setValue(value)
+
+        if name in ['Height', 'Width', 'OffsetX', 'OffsetY']:
+            self.width = self.controller.remote_device.node_map.get_node('Width').value
+            self.height = self.controller.remote_device.node_map.get_node('Height').value
+            self.set_data_template(self.height, self.width)
+
+    def feature_write_error(self, name: str, message: str):
+        self.emit_status(ThreadCommand('Update_Status', [f'Could not set {name}: {message}', 'log']))
+
+    def set_preview(self):
+        """Create the object publishing the previews of the frames to the dashboard extension"""
+        preview_settings = self.settings.child('preview')
+        if preview_settings.child('preview_enabled').value():
+            name = getattr(self.parent, 'title', None)
+            if not isinstance(name, str):
+                name = self.settings.child('cam_name').value()
+            self.preview_maker = PreviewMaker(name, max_size=preview_settings.child('preview_size').value(),
+                                              max_rate=preview_settings.child('preview_rate').value())
+        else:
+            self.preview_maker = None
+
+    def set_analysis(self):
+        """(Re)create the pool of processes running the per-frame analysis"""
+        if self.analysis_pipeline is not None:
+            self.analysis_pipeline.close()
+            self.analysis_pipeline = None
+        analysis_settings = self.settings.child('analysis')
+        if analysis_settings.child('analysis_enabled').value():
+            analysis = analysis_settings.child('analysis_custom').value()
+            if analysis == '':
+                analysis = analysis_settings.child('analysis_function').value()
+            try:
+                self.analysis_pipeline = AnalysisPipeline(
+                    analysis, n_workers=analysis_settings.child('analysis_workers').value(),
+                    policy=analysis_settings.child('analysis_policy').value())
+            except Exception as e:
+                self.emit_status(ThreadCommand('Update_Status', [f'Invalid analysis {analysis}: {e}', 'log']))
+                return
+            self.analysis_frame_ids = deque()
+            self.analysis_values = [np.nan for _ in self.analysis_pipeline.labels] + [np.nan]
+
+    def process_analysis(self, frame: np.ndarray, frame_id: int):
+        """Dispatch a frame to the analysis workers and keep the latest available result (the
+        results come in the order of the frames) together with the id of the frame it has been
+        computed from, both are exported with the current frame"""
+        n_skipped = self.analysis_pipeline.n_skipped
+        last_error = self.analysis_pipeline.last_error
+        if self.analysis_pipeline.submit(frame):
+            self.analysis_frame_ids.append(frame_id)
+        for values in self.analysis_pipeline.collect():
+            self.analysis_values = list(values) + [self.analysis_frame_ids.popleft()]
+        if self.analysis_pipeline.n_skipped != n_skipped:
+            self.settings.child('analysis', 'analysis_skipped').setValue(self.analysis_pipeline.n_skipped)
+        if self.analysis_pipeline.last_error != last_error:
+            self.emit_status(ThreadCommand('Update_Status', [
+                f'Analysis failed: {self.analysis_pipeline.last_error}', 'log']))
+
+    def set_governor(self):
+        """Create (or remove) the governor adapting the camera frame rate to the pipeline throughput"""
+        if self.governor is not None:
+            self.governor.release()
+            self.governor = None
+        governor_settings = self.settings.child('governor')
+        if governor_settings.child('governor_enabled').value():
+            self.governor = FrameRateGovernor(self.controller,
+                                              headroom=governor_settings.child('headroom').value(),
+                                              max_rate=governor_settings.child('max_rate').value())
+
+    def set_display(self):
+        """Create the lookup table converting high bit depth frames for display"""
+        display_settings = self.settings.child('display')
+        if display_settings.child('display_enabled').value():
+            self.display_lut = DisplayLUT(display_settings.child('display_curve').value(),
+                                          gamma=display_settings.child('display_gamma').value(),
+                                          auto_levels=display_settings.child('auto_levels').value(),
+                                          levels=(display_settings.child('display_low').value(),
+                                                  display_settings.child('display_high').value()))
+        else:
+            self.display_lut = None
+        self._data_key = None  # the exported data have to be rebuilt with or without the display data
+
+    def set_hdr(self):
+        """Configure the camera to cycle through the exposures of the HDR bracket (or restore its
+        exposure settings if HDR is disabled)"""
+        if self.hdr_bracket is not None:
+            self.hdr_bracket.restore()
+            self.hdr_bracket = None
+            self.hdr_merger = None
+        hdr_settings = self.settings.child('hdr')
+        mode = ''
+        if hdr_settings.child('hdr_enabled').value():
+            try:
+                exposures = parse_exposures(hdr_settings.child('hdr_exposures').value())
+                self.hdr_bracket = ExposureBracket(self.controller, exposures)
+                mode = self.hdr_bracket.configure()
+                self.hdr_merger = HDRMerger(exposures, saturation=hdr_settings.child('hdr_saturation').value())
+            except Exception as e:
+                self.hdr_bracket = None
+                self.emit_status(ThreadCommand('Update_Status', [f'Could not set the HDR mode: {e}', 'log']))
+        hdr_settings.child('hdr_mode').setValue(mode)
+        self._data_key = None
+
+    def set_hdr_template(self, height: int, width: int, data_format: str):
+        """Preallocate the HDR buffers and build the exported data around the radiance frame"""
+        saturation = self.settings.child('hdr', 'hdr_saturation').value()
+        if saturation == 0:
+            saturation = (1 << get_bit_depth(data_format)) - 1
+        self.hdr_merger.saturation = saturation
+        self.hdr_merger.allocate((height, width))
+        self.get_xaxis(width)
+        self.get_yaxis(height)
+        self.set_rings(np.zeros((height, width), dtype=np.float32))
+        self._data_key = ('hdr', height, width)
+        self.dte = self.make_dte()
+
+    def set_data_template(self, height: int, width: int, n_components: int = 1, data_format: str = None):
+        """Preallocate the frame buffers for a given geometry and pixel format, the exported data
+        of each frame are then built around the next buffer of the ring without copy
+
+        Parameters
+        ----------
+        height: int
+        width: int
+        n_components: int
+            number of components per pixel (1 for mono formats)
+        data_format: str
+            the PFNC pixel format, read from the PixelFormat node if not given
+        """
+        if data_format is None:
+            data_format = self.get_data_format()
+        bit_depth = get_bit_depth(data_format)
+        dtype = get_frame_dtype(bit_depth)  # the full precision frames, without conversion to float
+        self.get_xaxis(width)
+        self.get_yaxis(height)
+        shape = (height, width) if n_components == 1 else (height, width, n_components)
+        display = self.display_lut is not None and n_components == 1 and 8 < bit_depth <= 16
+        if display:
+            self.display_lut.set_bit_depth(bit_depth)
+        self.set_rings(np.zeros(shape, dtype=dtype),
+                       np.zeros((height, width), dtype=np.uint8) if display else None)
+        self._data_key = (height, width, n_components, data_format)
+        self.dte = self.make_dte()
+
+    def set_rings(self, frame: np.ndarray, display: np.ndarray = None):
+        """Allocate the rings of buffers like the given frame (and display) arrays"""
+        self._frame_ring = [frame] + [np.zeros_like(frame) for _ in range(FRAME_RING_SIZE - 1)]
+        if display is None:
+            self._display_ring = []
+        else:
+            self._display_ring = [display] + [np.zeros_like(display) for _ in range(FRAME_RING_SIZE - 1)]
+        self._ring_index = 0
+        self.data = self._frame_ring[0]
+        self.display_data = display
+
+    def next_buffers(self):
+        """Move data (and display_data) to the next buffers of the rings: the previous frames may
+        still be queued to the GUI and must not be overwritten"""
+        self._ring_index = (self._ring_index + 1) % len(self._frame_ring)
+        self.data = self._frame_ring[self._ring_index]
+        if len(self._display_ring) != 0:
+            self.display_data = self._display_ring[self._ring_index]
+
+    def make_dte(self) -> DataToExport:
+        """Build new exported data around the current buffers (no copy), timestamped now"""
+        if self._data_key[0] == 'hdr':
+            return DataToExport('myplugin', data=[
+                DataFromPlugins(name='GenICam HDR', data=[self.data], dim='Data2D',
+                                axes=[self.x_axis, self.y_axis])])
+        if self.data.ndim == 2:
+            channels = [self.data]
+        else:
+            channels = [self.data[:, :, ind] for ind in range(min(3, self.data.shape[2]))]
+        dwa_list = [DataFromPlugins(name='GenICam', data=channels, dim='Data2D',
+                                    axes=[self.x_axis, self.y_axis], do_plot=self.display_data is None)]
+        if self.display_data is not None:
+            dwa_list.append(DataFromPlugins(name='GenICam display', data=[self.display_data], dim='Data2D',
+                                            axes=[self.x_axis, self.y_axis], do_save=False))
+        if self.analysis_pipeline is not None:
+            dwa_list.append(DataFromPlugins(name='Analysis', dim='Data0D',
+                                            data=[np.array([float(value)]) for value in self.analysis_values],
+                                            labels=self.analysis_pipeline.labels + ['frame']))
+        return DataToExport('myplugin', data=dwa_list)
+
+    def get_data_format(self) -> str:
+        """Get the current pixel format of the device (Mono8 if it cannot be read)"""
+        try:
+            return self.controller.remote_device.node_map.get_node('PixelFormat').value
+        except Exception:
+            return 'Mono8'
+
     def set_ROI(self):  #todo this should be rewritten because ROIselect is no more part of
         # common settings,
         # see: https://github.com/PyMoDAQ/pymodaq_plugins_mockexamples/blob/main/src/pymodaq_plugins_mockexamples/daq_viewer_plugins/plugins_2D/daq_2Dviewer_RoiStuff.py
@@ -283,28 +616,35 @@ class DAQ_2DViewer_GenICam(DAQ_Viewer_base):
             if cti_paths == []:
                 file = select_file(start_path=r'C:\Program Files', save=False, ext='cti')
                 if file != '':
-                    cti_paths.append(str(file))
-                for path in cti_paths:
-                    harv.add_cti_file(path)
-                    harv.update_device_info_list()
-                devices = harv.device_info_list
-                devices_names = [device.model for device in devices]
-                # device = QtWidgets.QInputDialog.getItem(None, 'Pick an item', 'List of discovered cameras:', devices_names, editable = False)
-
-                self.settings.child('cam_name').setLimits(devices_names)
-                self.settings.child('cam_name').setValue(devices_names[0])
-                QtWidgets.QApplication.processEvents()
-
-            self.controller = harv.create({'model': self.settings.child('cam_name').value()})
+                    self.update_cam_names(add_cti_file(str(file)))
+                    self.settings.child('cam_name').setValue(devices_names[0])
+                    QtWidgets.QApplication.processEvents()
+
+            self.controller = create_acquirer(self.settings.child('cam_name').value())
             # self.controller.num_buffers = 2
-            self.controller.remote_device.node_map.get_node('OffsetX').value = 0
-            self.controller.remote_device.node_map.get_node('OffsetY').value = 0
-            self.controller.remote_device.node_map.get_node(
-                'Width').value = self.controller.remote_device.node_map.get_node('Width').max
-            self.controller.remote_device.node_map.get_node(
-                'Height').value = self.controller.remote_device.node_map.get_node('Height').max
+            self.set_full_frame()
+            if self.settings.child('transport', 'auto_tune').value():
+                self.tune_transport()
             self.get_features()
 
+        self.set_preview()
+        self.set_display()
+        self.set_governor()
+        self.settings.child('snapshots', 'user_set').setLimits(['None'] + get_user_sets(self.controller))
+
+        device_scanner.devices_changed.connect(self.update_cam_names)
+        device_scanner.subscribe()
+
+        self.stream_statistics = StreamStatistics(self.controller)
+        self.statistics_timer = QtCore.QTimer()
+        self.statistics_timer.timeout.connect(self.update_stream_statistics)
+        self.statistics_timer.start(1000)
+
+        self.feature_writer = FeatureWriter(self.controller)
+        self.feature_writer.value_set.connect(self.update_feature_value)
+        self.feature_writer.write_error.connect(self.feature_write_error)
+        self.feature_writer.start()
+
         on_new_buffer_callback =  CallbackOnNewBuffer()
         self.callback_thread = QtCore.QThread()
         on_new_buffer_callback.moveToThread(self.callback_thread)
@@ -315,102 +655,352 @@ class DAQ_2DViewer_GenICam(DAQ_Viewer_base):
              on_new_buffer_callback
         )
 
-        self.x_axis = self.get_xaxis()
-        self.y_axis = self.get_yaxis()
+        # the stream statistics own the (single) INCOMPLETE_BUFFER callback of harvesters
+        on_incomplete_buffer_callback = CallbackOnIncompleteBuffer()
+        on_incomplete_buffer_callback.buffer_incomplete.connect(self.retrigger_hdr)
+        self.stream_statistics.add_listener(on_incomplete_buffer_callback)
+        self.hdr_watchdog = QtCore.QTimer()
+        self.hdr_watchdog.setSingleShot(True)
+        self.hdr_watchdog.timeout.connect(self.retrigger_hdr)
+        self.scan_watchdog = QtCore.QTimer()
+        self.scan_watchdog.setSingleShot(True)
+        self.scan_watchdog.timeout.connect(self.end_scan)
+
         self.width_max = self.controller.remote_device.node_map.get_node('Width').max
         self.width = self.controller.remote_device.node_map.get_node('Width').value
         self.height_max = self.controller.remote_device.node_map.get_node('Height').max
         self.height = self.controller.remote_device.node_map.get_node('Height').value
-        self.data = np.zeros((self.height, self.width))
+        self.set_data_template(self.height, self.width)
         # initialize viewers with the future type of data
-        self.dte_signal_temp.emit(
-            DataToExport('myplugin',
-                         data=[
-                             DataFromPlugins(name='GenICam', data=[self.data], dim='Data2D',
-                                             axes=[self.x_axis, self.y_axis])]))
+        self.dte_signal_temp.emit(self.dte)
 
 
         info = "Whatever info you want to log"
         initialized = True
         return info, initialized
 
-    def get_xaxis(self) -> Axis:
-        """
-
-        """
-        Nx = self.controller.remote_device.node_map.get_node('Width').value
-        self.x_axis = Axis('xaxis', units='pxls', data=np.linspace(0, Nx-1, Nx, dtype=np.int32),
-                           index=1)
+    def set_full_frame(self):
+        """Set the ROI to the full sensor, in a single write if the device gives its maximum size
+        independently of the current offsets (SFNC WidthMax and HeightMax nodes)"""
+        node_map = self.controller.remote_device.node_map
+        features = [('OffsetX', EInterfaceType.intfIInteger.value, '0'),
+                    ('OffsetY', EInterfaceType.intfIInteger.value, '0')]
+        width_max = get_node(node_map, 'WidthMax')
+        height_max = get_node(node_map, 'HeightMax')
+        if width_max is not None and height_max is not None:
+            width_max, height_max = width_max.value, height_max.value
+        else:
+            # the maximum of Width and Height may depend on the offsets, read them once zeroed
+            write_features(self.controller, features)
+            features = []
+            width_max, height_max = node_map.get_node('Width').max, node_map.get_node('Height').max
+        write_features(self.controller,
+                       features + [('Width', EInterfaceType.intfIInteger.value, str(width_max)),
+                                   ('Height', EInterfaceType.intfIInteger.value, str(height_max))])
+
+    def get_xaxis(self, Nx: int = None) -> Axis:
+        """Get the linear pixel axis along the width (from the Width node if Nx is not given)"""
+        if Nx is None:
+            Nx = self.controller.remote_device.node_map.get_node('Width').value
+        self.x_axis = Axis('xaxis', units='pxls', offset=0, scaling=1, size=Nx, index=1)
         return self.x_axis
 
-    def get_yaxis(self):
-        """
+    def get_yaxis(self, Ny: int = None) -> Axis:
+        """Get the linear pixel axis along the height (from the Height node if Ny is not given)"""
+        if Ny is None:
+            Ny = self.controller.remote_device.node_map.get_node('Height').value
+        self.y_axis = Axis('yaxis', units='pxls', offset=0, scaling=1, size=Ny, index=0)
+        return self.y_axis
+
+    def tune_transport(self):
+        """Set the packet size and the throughput limit of GigE Vision cameras"""
+        if not is_gige(self.controller):
+            return
+        node_map = self.controller.remote_device.node_map
+        exposure = 0.
+        for name in ['ExposureTime', 'ExposureTimeAbs']:  # the latter on older GigE Vision cameras
+            node = get_node(node_map, name)
+            if node is not None:
+                exposure = node.value * 1e-6
+                break
+        result = tune_gige_transport(self.controller,
+                                     link_usage=self.settings.child('transport', 'link_usage').value(),
+                                     timeout=max(1., 3 * exposure + 0.5))
+        if result.get('packet_size') is not None:
+            self.settings.child('transport', 'packet_size').setValue(result['packet_size'])
+        if result.get('throughput') is not None:
+            self.settings.child('transport', 'throughput').setValue(result['throughput'] * 1e-6)
+
+    def save_config_snapshot(self):
+        """Save the current camera configuration under the name given in the settings"""
+        snapshot_settings = self.settings.child('snapshots')
+        name = snapshot_settings.child('snapshot_name').value()
+        user_set = snapshot_settings.child('user_set').value()
+        self.stop()
+        try:
+            save_snapshot(self.controller, name, user_set=None if user_set == 'None' else user_set)
+        except Exception as e:
+            self.emit_status(ThreadCommand('Update_Status', [f'Could not save the snapshot {name}: {e}', 'log']))
+            return
+        snapshot_settings.child('snapshot_list').setLimits(list_snapshots())
+        snapshot_settings.child('snapshot_list').setValue(name)
+
+    def restore_config_snapshot(self):
+        """Restore the selected camera configuration and refresh the features and the data geometry"""
+        snapshot_settings = self.settings.child('snapshots')
+        name = snapshot_settings.child('snapshot_list').value()
+        if name is None:
+            return
+        self.stop()
+        try:
+            method = load_snapshot(self.controller, name)
+        except Exception as e:
+            self.emit_status(ThreadCommand('Update_Status', [f'Could not restore the snapshot {name}: {e}', 'log']))
+            return
+        snapshot_settings.child('snapshot_method').setValue(method)
+        self.get_features()
+        self.width = self.controller.remote_device.node_map.get_node('Width').value
+        self.height = self.controller.remote_device.node_map.get_node('Height').value
+        self.set_data_template(self.height, self.width)
+
+    def update_stream_statistics(self):
+        stats = self.stream_statistics.get()
+        for key, value in stats.items():
+            self.settings.child('stream_stats', key).setValue(value)
+        if self.governor is not None and self.controller.is_acquiring():
+            sustainable_rate = self.governor.update(stats)
+            governor_settings = self.settings.child('governor')
+            governor_settings.child('processing_time').setValue(self.governor.processing_time * 1e3)
+            if sustainable_rate is not None:
+                governor_settings.child('sustainable_rate').setValue(sustainable_rate)
+            frame_rate = self.governor.get_frame_rate()
+            if frame_rate is not None:
+                governor_settings.child('frame_rate').setValue(frame_rate)
+
+    def update_cam_names(self, names: list):
+        """Update the list of available cameras when devices have been plugged or unplugged"""
+        self.settings.child('cam_name').setLimits(names)
+
+    def set_node_value(self, name: str, value) -> bool:
+        """Write a value into a node of the remote device if it exists and is writable
 
+        Returns
+        -------
+        bool: True if the value could be written
         """
-        Ny = self.controller.remote_device.node_map.get_node('Height').value
-        self.y_axis = Axis('yaxis', units='pxls', data=np.linspace(0, Ny-1, Ny, dtype=np.int32),
-                           index=0)
-        return self.y_axis
+        try:
+            self.controller.remote_device.node_map.get_node(name).value = value
+            return True
+        except Exception:
+            return False
+
+    def set_hardware_scan(self):
+        """Configure the camera and the frame to position mapping for a hardware-timed scan
+
+        In counter mode the camera waits for one trigger per position (for instance from the
+        position compare output of the actuator controller). In timestamp mode the acquisition is
+        started by a trigger of the actuator at the beginning of its motion (AcquisitionStart
+        trigger), the camera then runs freely at the rate needed to get one frame per position at
+        the given actuator velocity.
+        """
+        scan_settings = self.settings.child('hw_scan')
+        enabled = scan_settings.child('hw_scan_enabled').value()
+        mode = scan_settings.child('sync_mode').value()
+        if not enabled and not self._scan_triggers_set:
+            # the triggers belong to the user (Cam. Prop.) as long as the scan has not set them
+            self.scan_mapper = None
+            self.scan_data = None
+            return
+        self._scan_triggers_set = enabled
+        if enabled:
+            positions = np.linspace(scan_settings.child('scan_start').value(),
+                                    scan_settings.child('scan_stop').value(),
+                                    scan_settings.child('scan_npts').value())
+            self.scan_mapper = FramePositionMapper(positions, mode=mode,
+                                                   velocity=scan_settings.child('scan_velocity').value())
+        else:
+            self.scan_mapper = None
+            self.scan_data = None
+
+        self.set_node_value('TriggerSelector', 'FrameStart')
+        if enabled and mode == 'counter':
+            self.set_node_value('TriggerSource', scan_settings.child('trigger_source').value())
+            self.set_node_value('TriggerActivation', 'RisingEdge')
+            self.set_node_value('TriggerMode', 'On')
+        else:
+            self.set_node_value('TriggerMode', 'Off')
+
+        # without a start trigger nothing relates the device timestamps to the actuator motion
+        anchored = False
+        if self.set_node_value('TriggerSelector', 'AcquisitionStart'):
+            if enabled and mode == 'timestamp':
+                anchored = self.set_node_value('TriggerSource', scan_settings.child('trigger_source').value())
+                self.set_node_value('TriggerActivation', 'RisingEdge')
+                anchored = anchored and self.set_node_value('TriggerMode', 'On')
+            else:
+                self.set_node_value('TriggerMode', 'Off')
+
+        if enabled and mode == 'timestamp':
+            if not anchored:
+                self.scan_mapper = None
+                self.emit_status(ThreadCommand('Update_Status', [
+                    'The timestamp mode needs an AcquisitionStart hardware trigger from the actuator', 'log']))
+            elif self.scan_mapper.n_positions > 1:
+                step = abs(self.scan_mapper.positions[1] - self.scan_mapper.positions[0])
+                if step > 0:
+                    self.set_node_value('AcquisitionFrameRateEnable', True)
+                    self.set_node_value('AcquisitionFrameRate',
+                                        scan_settings.child('scan_velocity').value() / step)
+
+    def emit_scan(self):
+        """Emit the frames of a complete hardware-timed scan as a single ND data"""
+        self.settings.child('hw_scan', 'scan_missing').setValue(self.scan_mapper.n_missing)
+        nav_axis = Axis('position', units=self.settings.child('hw_scan', 'scan_units').value(),
+                        data=self.scan_mapper.positions, index=0)
+        self.dte_signal.emit(
+            DataToExport('myplugin',
+                         data=[
+                             DataFromPlugins(name='GenICam', data=[self.scan_data], dim='DataND',
+                                             nav_indexes=(0,),
+                                             axes=[nav_axis,
+                                                   Axis('yaxis', units='pxls',
+                                                        data=np.arange(self.scan_data.shape[1]),
+                                                        index=1),
+                                                   Axis('xaxis', units='pxls',
+                                                        data=np.arange(self.scan_data.shape[2]),
+                                                        index=2)])]))
 
     def close(self):
         """Terminate the communication protocol"""
         self.stop()
+        if self.feature_writer is not None:
+            self.feature_writer.quit()
+        if self.analysis_pipeline is not None:
+            self.analysis_pipeline.close()
+        if self.hdr_bracket is not None:
+            self.hdr_bracket.restore()
+        if self.governor is not None:
+            self.governor.release()
+        if self.statistics_timer is not None:
+            self.statistics_timer.stop()
+        if self.hdr_watchdog is not None:
+            self.hdr_watchdog.stop()
+        if self.scan_watchdog is not None:
+            self.scan_watchdog.stop()
+        device_scanner.devices_changed.disconnect(self.update_cam_names)
+        device_scanner.unsubscribe()
         self.controller.destroy()
-        harv.reset()
 
     def emit_data(self):
-
+        start = time.perf_counter()
+        if self.scan_mapper is not None:
+            self.emit_scan_frame()
+        elif self.hdr_merger is not None:
+            self.emit_hdr_frame()
+        else:
+            self.emit_frame()
+        if self.governor is not None:
+            self.governor.frame_processed(time.perf_counter() - start)
+
+    def emit_dte(self):
+        """Emit new exported data around the buffers just filled: the emitted object is not modified
+        afterwards, even if the GUI gets it late through a queued connection"""
+        self.dte = self.make_dte()
+        self.dte_signal.emit(self.dte)
+
+    def emit_frame(self):
+        """Fetch a frame, copy it into the preallocated buffer, run the optional processing and
+        emit it"""
         with self.controller.fetch() as buffer:
-            payload = buffer.payload
-            component = payload.components[0]
-            width = component.width
-            height = component.height
+            component = buffer.payload.components[0]
             data_format = component.data_format
-
-            # if self.settings.child('ROIselect', 'use_ROI').value():
-            #     offsetx = self.controller.remote_device.node_map.get_node('OffsetX').value
-            #     offsety = self.controller.remote_device.node_map.get_node('OffsetY').value
-            # else:
-            #     offsetx = 0
-            #     offsety = 0
-            offsetx = 0
-            offsety = 0
-
             if data_format in mono_location_formats:
-                data_tmp = component.data.reshape(height, width)
-                self.data[offsety:offsety + height, offsetx:offsetx + width] = data_tmp
-                self.dte_signal.emit(
-                    DataToExport('myplugin',
-                                 data=[
-                                     DataFromPlugins(name='GenICam', data=[self.data],
-                                                     dim='Data2D',
-                                                     axes=[self.x_axis, self.y_axis])]))
+                n_components = 1
             else:
-                # The image requires you to reshape it to draw it on the canvas:
-                if data_format in rgb_formats or \
-                        data_format in rgba_formats or \
-                        data_format in bgr_formats or \
-                        data_format in bgra_formats:
-                    #
-                    content = component.data.reshape(height, width,
-                                                     int(component.num_components_per_pixel)
-                                                     # Set of R, G, B, and Alpha
-                                                     )
-                    #
-                    if data_format in bgr_formats:
-                        # Swap every R and B:
-                        content = content[:, :, ::-1]
-                self.data_grabed_signal.emit(
-                    DataToExport('myplugin',
-                                 data=[
-                                     DataFromPlugins(name='GenICam',
-                                                     data=[
-                                                         self.data[:, :, ind] for ind in
-                                                         range(min(3, component.num_components_per_pixel))],
-                                                     dim='Data2D',
-                                                     axes=[self.x_axis, self.y_axis])]))
-
-
+                n_components = int(component.num_components_per_pixel)  # Set of R, G, B, and Alpha
+            if (component.height, component.width, n_components, data_format) != self._data_key:
+                self.set_data_template(component.height, component.width, n_components, data_format)
+            self.next_buffers()
+
+            # The image requires you to reshape it to draw it on the canvas:
+            content = component.data.reshape(self.data.shape)
+            if data_format in bgr_formats:
+                # Swap every R and B:
+                content = content[:, :, ::-1]
+            self.data[...] = content
+            if self.display_data is not None:
+                self.display_lut.convert(self.data, out=self.display_data)
+            self._frame_counter += 1
+            frame_id = getattr(buffer, 'frame_id', None)
+            if frame_id is None:
+                frame_id = self._frame_counter
+            if self.preview_maker is not None:
+                self.preview_maker.process(content, frame_id)
+            if self.analysis_pipeline is not None and n_components == 1:
+                self.process_analysis(content, frame_id)
+
+        self.emit_dte()
+
+    def emit_hdr_frame(self):
+        """Accumulate a frame of the exposure bracket and emit the radiance frame once the
+        bracket is complete"""
+        with self.controller.fetch() as buffer:
+            component = buffer.payload.components[0]
+            if ('hdr', component.height, component.width) != self._data_key:
+                self.set_hdr_template(component.height, component.width, component.data_format)
+            index = self.hdr_bracket.next(getattr(buffer, 'frame_id', None))
+            self.start_hdr_watchdog()
+            self.hdr_merger.add(component.data.reshape(self.hdr_merger.shape), index)
+        if index == len(self.hdr_merger.exposures) - 1:
+            self.next_buffers()
+            self.hdr_merger.merge(out=self.data)
+            self.emit_dte()
+
+    def start_hdr_watchdog(self):
+        """(Re)start the timer re-triggering the pending frame of a software triggered bracket"""
+        if self.hdr_watchdog is not None and self.hdr_bracket.mode == 'software':
+            self.hdr_watchdog.start(self.hdr_bracket.get_timeout())
+
+    def retrigger_hdr(self):
+        """Trigger again the pending frame of the bracket: it has been received incomplete or has
+        not been received in time, without it the software triggered acquisition would stall"""
+        if self.hdr_bracket is None or not self.controller.is_acquiring():
+            return
+        try:
+            self.hdr_bracket.retrigger()
+        except Exception as e:
+            self.emit_status(ThreadCommand('Update_Status', [f'Could not trigger the HDR frame: {e}', 'log']))
+        self.start_hdr_watchdog()
+
+    def emit_scan_frame(self):
+        """Store a frame of a hardware-timed scan at its scan position and emit the whole scan
+        once the last position has been reached"""
+        with self.controller.fetch() as buffer:
+            self._frame_counter += 1
+            frame_id = getattr(buffer, 'frame_id', None)
+            if frame_id is None:
+                frame_id = self._frame_counter
+            timestamp_ns = buffer.timestamp_ns
+            component = buffer.payload.components[0]
+            index = self.scan_mapper.map(frame_id=frame_id, timestamp_ns=timestamp_ns)
+            if index is not None:
+                self.scan_data[index] = component.data.reshape(component.height, component.width,
+                                                               -1)[:, :, 0]
+            complete = self.scan_mapper.is_complete(frame_id=frame_id, timestamp_ns=timestamp_ns)
+        if complete:
+            self.stop()
+            self.emit_scan()
+        elif self.scan_watchdog is not None:
+            self.scan_watchdog.start(int(1000 * (SCAN_TIMEOUT_PERIODS * self.scan_mapper.frame_period +
+                                                 SCAN_TIMEOUT_MARGIN)))
+
+    def end_scan(self):
+        """Stop a hardware-timed scan whose frames stopped coming (last frames lost or incomplete)
+        and emit it with the positions received so far"""
+        if self.scan_mapper is None or not self.controller.is_acquiring():
+            return
+        self.stop()
+        self.emit_scan()
 
     def grab_data(self, Naverage=1, **kwargs):
         """Start a grab from the detector
@@ -427,11 +1017,23 @@ class DAQ_2DViewer_GenICam(DAQ_Viewer_base):
             self.live = kwargs['live']
 
         if not self.controller.is_acquiring():
+            if self.scan_mapper is not None:
+                self.scan_mapper.reset()
+                self._frame_counter = 0
+                self.scan_data = np.zeros((self.scan_mapper.n_positions, self.height, self.width),
+                                          dtype=get_frame_dtype(get_bit_depth(self.get_data_format())))
             self.controller.start(run_as_thread=True)  # set to True in order to catch `NEW_BUFFER_AVAILABLE` event
+            if self.hdr_bracket is not None:
+                self.hdr_bracket.start()
+                self.start_hdr_watchdog()
 
 
     def stop(self):
         """Stop the current grab hardware wise if necessary"""
+        if self.hdr_watchdog is not None:
+            self.hdr_watchdog.stop()
+        if self.scan_watchdog is not None:
+            self.scan_watchdog.stop()
         self.controller.stop()
 
 
@@ -449,5 +1051,13 @@ class CallbackOnNewBuffer(QtCore.QObject, Callback):
         QtCore.QThread.msleep(self.wait_time)
 
 
+class CallbackOnIncompleteBuffer(QtCore.QObject, Callback):
+    # Callback class signaling the buffers dropped by harvesters because they were incomplete
+    buffer_incomplete = QtCore.Signal()
+
+    def emit(self, context):
+        self.buffer_incomplete.emit()
+
+
 if __name__ == '__main__':
     main(__file__, init=True)
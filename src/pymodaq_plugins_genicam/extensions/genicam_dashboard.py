@@ -0,0 +1,171 @@
+import numpy as np
+
+from pymodaq.utils import gui_utils as gutils
+from pymodaq.utils.logger import set_logger, get_module_name
+from pymodaq.extensions.utils import CustomExt
+from qtpy import QtWidgets, QtCore
+import pyqtgraph as pg
+
+from pymodaq_plugins_genicam.hardware.preview import preview_hub
+
+
+logger = set_logger(get_module_name(__file__))
+
+EXTENSION_NAME = 'GenICam Dashboard'
+CLASS_NAME = 'GenICamDashboard'
+
+
+class PreviewTile(QtWidgets.QWidget):
+    """Display the preview of one camera: image, histogram and acquisition counters"""
+
+    def __init__(self, name: str, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.log_histogram = False
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(2, 2, 2, 2)
+        self.setLayout(layout)
+
+        self.title_label = QtWidgets.QLabel(f'<b>{name}</b>')
+        layout.addWidget(self.title_label)
+
+        graphics = pg.GraphicsLayoutWidget()
+        layout.addWidget(graphics)
+        view = graphics.addViewBox(row=0, col=0, lockAspect=True, invertY=True)
+        self.image_item = pg.ImageItem(axisOrder='row-major')
+        view.addItem(self.image_item)
+
+        histogram_plot = graphics.addPlot(row=1, col=0)
+        histogram_plot.setMaximumHeight(80)
+        histogram_plot.hideAxis('left')
+        self.histogram_curve = histogram_plot.plot(fillLevel=0, brush=(100, 100, 255, 150))
+
+        self.stats_label = QtWidgets.QLabel('')
+        layout.addWidget(self.stats_label)
+
+    def show_preview(self, preview: dict):
+        self.image_item.setImage(preview['image'], autoLevels=False, levels=(0, 255))
+        edges = preview['bin_edges']
+        histogram = np.log10(preview['histogram'] + 1) if self.log_histogram else preview['histogram']
+        self.histogram_curve.setData(0.5 * (edges[1:] + edges[:-1]), histogram)
+        self.stats_label.setText(f"{preview['fps']:.1f} fps - frames: {preview['frames']} - "
+                                 f"dropped: {preview['dropped']}")
+
+
+class GenICamDashboard(CustomExt):
+    """Display side by side low cost previews of every GenICam camera of the dashboard
+
+    Previews (downsampled, rate limited and converted to uint8 images, incremental histograms and
+    counters) are computed by the GenICam viewer plugins, this extension only displays them.
+    """
+    params = [
+        {'title': 'Previews:', 'name': 'previews', 'type': 'group', 'children': [
+            {'title': 'Max size (pxls):', 'name': 'preview_size', 'type': 'int', 'value': 256, 'min': 16},
+            {'title': 'Max rate (Hz):', 'name': 'preview_rate', 'type': 'float', 'value': 5., 'min': 0.1},
+            {'title': 'Enable on all cameras:', 'name': 'enable_previews', 'type': 'bool_push',
+             'value': False},
+        ]},
+        {'title': 'Layout:', 'name': 'layout', 'type': 'group', 'children': [
+            {'title': 'N columns (0: auto):', 'name': 'n_columns', 'type': 'int', 'value': 0, 'min': 0},
+            {'title': 'Log histograms:', 'name': 'log_histogram', 'type': 'bool', 'value': False},
+        ]},
+    ]
+
+    def __init__(self, parent: gutils.DockArea, dashboard):
+        super().__init__(parent, dashboard)
+        self.tiles = {}
+        self.setup_ui()
+
+    def connect_things(self):
+        preview_hub.preview_ready.connect(self.show_preview)
+
+    def setup_docks_and_widgets(self):
+        self.docks['settings'] = gutils.Dock('Settings')
+        self.dockarea.addDock(self.docks['settings'])
+        self.docks['settings'].addWidget(self.settings_tree)
+
+        self.docks['previews'] = gutils.Dock('GenICam cameras')
+        self.dockarea.addDock(self.docks['previews'], 'right', self.docks['settings'])
+        widget = QtWidgets.QWidget()
+        self.tiles_layout = QtWidgets.QGridLayout()
+        widget.setLayout(self.tiles_layout)
+        self.docks['previews'].addWidget(widget)
+
+    def setup_actions(self):
+        pass
+
+    def stop(self):
+        """Nothing is driven by the extension, it only displays the previews"""
+        pass
+
+    def value_changed(self, param):
+        if param.name() == 'enable_previews':
+            if param.value():
+                self.enable_previews()
+                param.setValue(False)
+        elif param.name() == 'n_columns':
+            self.arrange_tiles()
+        elif param.name() == 'log_histogram':
+            for tile in self.tiles.values():
+                tile.log_histogram = param.value()
+
+    def get_genicam_detectors(self) -> list:
+        if self.modules_manager is None:
+            return []
+        # the detector of a DAQ_Viewer is a SelectedModule (DAQ type and plugin name)
+        return [det for det in self.modules_manager.detectors_all
+                if getattr(det.detector, 'module_name', det.detector) == 'GenICam']
+
+    def enable_previews(self):
+        """Ask every GenICam viewer of the dashboard to publish its previews"""
+        for det in self.get_genicam_detectors():
+            try:
+                preview_settings = det.settings.child('detector_settings', 'preview')
+                preview_settings.child('preview_size').setValue(self.settings.child('previews', 'preview_size').value())
+                preview_settings.child('preview_rate').setValue(self.settings.child('previews', 'preview_rate').value())
+                preview_settings.child('preview_enabled').setValue(True)
+            except Exception as e:
+                logger.warning(f'Could not enable the preview of {det.title}: {e}')
+
+    def arrange_tiles(self):
+        n_columns = self.settings.child('layout', 'n_columns').value()
+        if n_columns == 0:
+            n_columns = max(1, int(np.ceil(np.sqrt(len(self.tiles)))))
+        for ind, name in enumerate(sorted(self.tiles)):
+            self.tiles_layout.addWidget(self.tiles[name], ind // n_columns, ind % n_columns)
+
+    @QtCore.Slot(str, object)
+    def show_preview(self, name: str, preview: dict):
+        if name not in self.tiles:
+            self.tiles[name] = PreviewTile(name)
+            self.tiles[name].log_histogram = self.settings.child('layout', 'log_histogram').value()
+            self.arrange_tiles()
+        self.tiles[name].show_preview(preview)
+
+
+def main():
+    """Start the extension together with a dashboard, load a preset from the dashboard to get the
+    cameras"""
+    import sys
+    from pymodaq.dashboard import DashBoard
+    app = QtWidgets.QApplication(sys.argv)
+    mainwindow = QtWidgets.QMainWindow()
+    dockarea = gutils.DockArea()
+    mainwindow.setCentralWidget(dockarea)
+
+    #  init the dashboard
+    mainwindow_dash = QtWidgets.QMainWindow()
+    area_dash = gutils.DockArea()
+    mainwindow_dash.setCentralWidget(area_dash)
+    dashboard = DashBoard(area_dash)
+    mainwindow_dash.show()
+
+    prog = GenICamDashboard(dockarea, dashboard)
+
+    mainwindow.show()
+    sys.exit(app.exec_())
+
+
+if __name__ == '__main__':
+    main()
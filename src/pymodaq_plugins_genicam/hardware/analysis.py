@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+Per-frame analysis dispatched to a pool of processes. Frames are handed over to the workers
+through shared memory slots (no pickling of the image), results are returned in the order of the
+frames and back-pressure is applied when the workers cannot keep up with the acquisition.
+
+@author: Sebastien Weber
+"""
+import functools
+import importlib
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from pymodaq.utils.logger import set_logger, get_module_name
+
+logger = set_logger(get_module_name(__file__))
+
+BACK_PRESSURE_POLICIES = ['skip', 'block']
+
+ANALYSES: Dict[str, Tuple[Callable, List[str]]] = {}
+
+_attached_memories: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def register_analysis(name: str, labels: List[str]):
+    """Decorator registering a function as an available per-frame analysis
+
+    The function takes a 2D ndarray and returns a sequence of floats, one per label. It must be
+    defined at module level in an importable module so that the worker processes can find it.
+    """
+    def wrapper(func: Callable):
+        ANALYSES[name] = (func, labels)
+        return func
+    return wrapper
+
+
+def get_analysis(name: str) -> Tuple[Callable, List[str]]:
+    """Get a registered analysis from its name or from a 'package.module:function' path, in which
+    case the function should have a `labels` attribute"""
+    if name in ANALYSES:
+        return ANALYSES[name]
+    if ':' not in name:
+        raise ValueError(f'Unknown analysis {name}, should be registered or a package.module:function path')
+    module_name, func_name = name.split(':')
+    func = functools.reduce(getattr, func_name.split('.'), importlib.import_module(module_name))
+    return func, list(getattr(func, 'labels', [func_name]))
+
+
+def get_analysis_path(func: Callable) -> str:
+    """Get the 'package.module:function' path of an analysis function, so that worker processes
+    find it even if it has been registered by a module they did not import"""
+    return f'{func.__module__}:{func.__qualname__}'
+
+
+@register_analysis('Peak', ['x', 'y', 'amplitude'])
+def find_peak(frame: np.ndarray):
+    index = int(np.argmax(frame))
+    y, x = divmod(index, frame.shape[1])
+    return float(x), float(y), float(frame.flat[index])
+
+
+@register_analysis('Centroid', ['x', 'y', 'sigma_x', 'sigma_y'])
+def centroid(frame: np.ndarray):
+    weights = frame.astype(np.float64)
+    weights -= weights.min()
+    total = weights.sum()
+    if total == 0:
+        return np.nan, np.nan, np.nan, np.nan
+    proj_x = weights.sum(axis=0) / total
+    proj_y = weights.sum(axis=1) / total
+    xs = np.arange(proj_x.size)
+    ys = np.arange(proj_y.size)
+    x0 = float(np.sum(xs * proj_x))
+    y0 = float(np.sum(ys * proj_y))
+    sigma_x = float(np.sqrt(np.sum((xs - x0) ** 2 * proj_x)))
+    sigma_y = float(np.sqrt(np.sum((ys - y0) ** 2 * proj_y)))
+    return x0, y0, sigma_x, sigma_y
+
+
+def _run_analysis(name: str, memory_name: str, shape: tuple, dtype: str, slot_names: Tuple[str]):
+    """Executed in the worker processes: attach (once) the shared memory slot holding the frame
+    and apply the analysis on it. Slots released by the pipeline (slot_names being the current
+    ones) are detached."""
+    for stale_name in set(_attached_memories).difference(slot_names):
+        _attached_memories.pop(stale_name).close()
+    if memory_name not in _attached_memories:
+        _attached_memories[memory_name] = shared_memory.SharedMemory(name=memory_name)
+    frame = np.ndarray(shape, dtype=dtype, buffer=_attached_memories[memory_name].buf)
+    func, _ = get_analysis(name)
+    return [float(value) for value in func(frame)]
+
+
+class _Slot:
+    def __init__(self, shape: tuple, dtype: np.dtype):
+        nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        self.memory = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.memory.buf)
+
+    def release(self):
+        del self.array
+        self.memory.close()
+        self.memory.unlink()
+
+
+class AnalysisPipeline:
+    """Dispatch frames to a pool of processes running a given analysis
+
+    Parameters
+    ----------
+    analysis: str
+        the name of a registered analysis (see `register_analysis`) or a 'package.module:function'
+        path
+    n_workers: int
+        the number of worker processes
+    policy: str
+        what to do when all the shared memory slots are in use: 'skip' drops the incoming frame,
+        'block' waits for the oldest frame to be processed
+    """
+
+    def __init__(self, analysis: str = 'Peak', n_workers: int = 2, policy: str = 'skip'):
+        if policy not in BACK_PRESSURE_POLICIES:
+            raise ValueError(f'Unknown policy: {policy}, should be one of {BACK_PRESSURE_POLICIES}')
+        self.analysis = analysis
+        func, self.labels = get_analysis(analysis)
+        self._analysis_path = get_analysis_path(func)
+        self.n_workers = n_workers
+        self.policy = policy
+        self.n_skipped = 0
+        self.n_errors = 0
+        self.last_error = ''
+
+        # forking a process running Qt and harvesters threads may deadlock
+        self._executor = ProcessPoolExecutor(max_workers=n_workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        self._slots: List[_Slot] = []
+        self._slot_names: Tuple[str] = ()
+        self._free_slots: deque = deque()
+        self._in_flight: deque = deque()
+        self._results: List[List[float]] = []
+
+    def _allocate(self, shape: tuple, dtype: np.dtype):
+        self._wait_all()
+        self._release_slots()
+        self._slots = [_Slot(shape, dtype) for _ in range(2 * self.n_workers)]
+        self._slot_names = tuple([slot.memory.name for slot in self._slots])
+        self._free_slots = deque(self._slots)
+
+    def _release_slots(self):
+        for slot in self._slots:
+            slot.release()
+        self._slots = []
+        self._free_slots.clear()
+
+    def _pop_oldest(self):
+        future, slot = self._in_flight.popleft()
+        self._free_slots.append(slot)
+        try:
+            self._results.append(future.result())
+        except Exception as e:
+            self.n_errors += 1
+            if str(e) != self.last_error:
+                logger.warning(f'Analysis {self.analysis} failed: {e}')
+            self.last_error = str(e)
+            self._results.append([np.nan for _ in self.labels])
+
+    def _wait_all(self):
+        while len(self._in_flight) != 0:
+            self._pop_oldest()
+
+    def submit(self, frame: np.ndarray) -> bool:
+        """Copy a frame into a free shared memory slot and dispatch it to the workers
+
+        Returns
+        -------
+        bool: False if the frame has been skipped because the workers are behind
+        """
+        if len(self._slots) == 0 or self._slots[0].array.shape != frame.shape or \
+                self._slots[0].array.dtype != frame.dtype:
+            self._allocate(frame.shape, frame.dtype)
+        self._collect_done()
+        if len(self._free_slots) == 0:
+            if self.policy == 'skip':
+                self.n_skipped += 1
+                return False
+            self._pop_oldest()
+        slot = self._free_slots.popleft()
+        slot.array[...] = frame
+        future: Future = self._executor.submit(_run_analysis, self._analysis_path, slot.memory.name,
+                                               frame.shape, frame.dtype.str, self._slot_names)
+        self._in_flight.append((future, slot))
+        return True
+
+    def _collect_done(self):
+        while len(self._in_flight) != 0 and self._in_flight[0][0].done():
+            self._pop_oldest()
+
+    def collect(self) -> List[List[float]]:
+        """Get the results of the processed frames in the order the frames were submitted"""
+        self._collect_done()
+        results = self._results
+        self._results = []
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._in_flight.clear()
+        self._release_slots()
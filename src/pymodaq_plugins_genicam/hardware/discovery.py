@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+Discovery of the GenTL producers (.cti files) and of the connected devices. A single Harvester is
+shared by all the plugins of this package, device lists are refreshed from a background thread.
+
+@author: Sebastien Weber
+"""
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Iterable, List
+
+from qtpy import QtCore
+
+from harvesters.core import Harvester, ImageAcquirer, DeviceInfo
+
+from pymodaq.utils.logger import set_logger, get_module_name
+from pymodaq_plugins_genicam import config
+
+logger = set_logger(get_module_name(__file__))
+
+GENTL_PATH_VARIABLE = 'GENICAM_GENTL64_PATH' if sys.maxsize > 2 ** 32 else 'GENICAM_GENTL32_PATH'
+
+VENDOR_CTI_FOLDERS = [r'C:\Program Files\MATRIX VISION\mvIMPACT Acquire\bin\x64',
+                      r'C:\Program Files\Teledyne\Spinnaker\cti64\vs2015']
+
+
+def get_config_value(*keys, default=None):
+    try:
+        return config(*keys)
+    except Exception:
+        return default
+
+
+def find_cti_files(paths: Iterable[str] = ()) -> List[str]:
+    """Look for GenTL producers
+
+    The folders listed in the GENICAM_GENTL64_PATH (or GENICAM_GENTL32_PATH) environment variable
+    are searched first as specified by the GenTL standard, then the given paths (folders or .cti
+    files) and finally some known vendor install folders (recursively). A producer found in several
+    places is only kept once.
+
+    Returns
+    -------
+    list of str: the paths of the .cti files
+    """
+    candidates = []
+    for folder in os.environ.get(GENTL_PATH_VARIABLE, '').split(os.pathsep):
+        if folder != '':
+            candidates.append((Path(folder), False))
+    candidates.extend([(Path(path), False) for path in paths])
+    candidates.extend([(Path(folder), True) for folder in VENDOR_CTI_FOLDERS])
+
+    cti_files = []
+    producer_names = set()
+    for path, recursive in candidates:
+        if path.is_file():
+            files = [path] if path.suffix.lower() == '.cti' else []
+        elif path.is_dir():
+            files = sorted(path.rglob('*.cti') if recursive else path.glob('*.cti'))
+        else:
+            continue
+        for file in files:
+            name = file.name.lower()
+            if name not in producer_names:
+                producer_names.add(name)
+                cti_files.append(str(file.resolve()))
+    return cti_files
+
+
+harv = Harvester()
+harvester_lock = threading.RLock()
+
+cti_paths = find_cti_files(get_config_value('cti', 'paths', default=[]))
+for path in cti_paths:
+    harv.add_file(path)
+harv.update()
+
+devices_names = [device.model for device in harv.device_info_list]
+
+
+def add_cti_file(path: str):
+    """Add a producer and update the list of devices"""
+    with harvester_lock:
+        if path not in cti_paths:
+            cti_paths.append(path)
+            harv.add_file(path)
+    return rescan_devices()
+
+
+def rescan_devices() -> List[str]:
+    """Update the list of devices and the module level `devices_names`
+
+    A full Harvester update releases every ImageAcquirer, so it is only done when no camera is
+    opened, otherwise the device lists of every opened interface are refreshed (including the ones
+    that had no device so far).
+
+    Returns
+    -------
+    list of str: the models of the connected devices
+    """
+    with harvester_lock:
+        # destroyed acquirers stay in the list of the Harvester but are no more valid
+        if not any([acquirer.is_valid() for acquirer in harv.image_acquirers]):
+            harv.update()
+        else:
+            harv.device_info_list.clear()
+            for interface in harv._ifaces:
+                interface.module.update_device_info_list(harv.timeout_for_update)
+                for dev_info in interface.module.device_info_list:
+                    harv.device_info_list.append(DeviceInfo(module=dev_info, parent=interface))
+        devices_names[:] = [device.model for device in harv.device_info_list]
+        return list(devices_names)
+
+
+def create_acquirer(model: str) -> ImageAcquirer:
+    with harvester_lock:
+        return harv.create({'model': model})
+
+
+class DeviceScanner(QtCore.QObject):
+    """Periodically rescan the connected devices from a background thread
+
+    A single instance (`device_scanner`) is shared by the plugins, it runs as long as one of them is
+    subscribed.
+
+    Signals
+    -------
+    devices_changed: list
+        the models of the connected devices, emitted when a device has been plugged or unplugged
+    """
+    devices_changed = QtCore.Signal(list)
+
+    def __init__(self, interval_ms: int = 2000):
+        super().__init__()
+        self.interval_ms = interval_ms
+        self._subscribers = 0
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread = None
+
+    def subscribe(self):
+        self._subscribers += 1
+        if self._thread is None and self.interval_ms > 0:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def unsubscribe(self):
+        self._subscribers = max(0, self._subscribers - 1)
+        if self._subscribers == 0 and self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        names = list(devices_names)
+        while not self._stop_event.wait(self.interval_ms / 1000):
+            try:
+                new_names = rescan_devices()
+            except Exception as e:
+                logger.warning(f'Could not rescan the GenICam devices: {e}')
+                continue
+            if new_names != names:
+                names = new_names
+                self.devices_changed.emit(names)
+
+
+device_scanner = DeviceScanner(get_config_value('cti', 'rescan_interval_ms', default=2000))
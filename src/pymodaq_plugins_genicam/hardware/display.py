@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+Conversion of high bit depth frames (Mono10, Mono12, Mono16...) to 8 bits images for display using
+a precomputed lookup table
+
+@author: Sebastien Weber
+"""
+import re
+from typing import Tuple
+
+import numpy as np
+
+DISPLAY_CURVES = ['linear', 'gamma', 'log']
+MAX_BIT_DEPTH = 32
+LOG_DYNAMIC = 1000.  # ratio between the high level and the smallest distinguishable value in log
+
+
+def get_bit_depth(data_format: str) -> int:
+    """Get the number of bits per pixel component from a PFNC pixel format name, 8 if it cannot be
+    inferred
+
+    The bit depth is the first number following the component token, after the 3D coordinates
+    prefix and the colour standard or chroma subsampling codes (e.g. Mono12p: 12, RGB10p32: 10,
+    YCbCr709_422_8: 8, Coord3D_ABC16: 16).
+    """
+    name = re.sub(r'^Coord3D_', '', data_format)
+    name = re.sub(r'(601|709|2020|411|422|444)_', '', name)
+    match = re.search(r'\d+', name)
+    if match is None or not 0 < int(match.group()) <= MAX_BIT_DEPTH:
+        return 8
+    return int(match.group())
+
+
+def get_frame_dtype(bit_depth: int) -> np.dtype:
+    """Get the smallest numpy dtype holding the pixels of a given bit depth without loss"""
+    if bit_depth <= 8:
+        return np.dtype(np.uint8)
+    elif bit_depth <= 16:
+        return np.dtype(np.uint16)
+    return np.dtype(np.float64)
+
+
+class DisplayLUT:
+    """Map integer frames to uint8 images through a lookup table
+
+    The table covers every possible pixel value of the bit depth and is only recomputed when the
+    levels, the curve or the bit depth change. With auto levels, the levels are percentiles of the
+    histogram of the frame subsampled with a stride derived from its size.
+
+    Parameters
+    ----------
+    curve: str
+        one of DISPLAY_CURVES
+    gamma: float
+        exponent of the gamma curve
+    auto_levels: bool
+        if True the levels are computed from each frame, otherwise low and high are used
+    levels: tuple of int
+        the pixel values mapped to 0 and 255 (the high value being the maximum of the bit depth if 0)
+    n_samples: int
+        approximate number of pixels used to compute the histogram, small frames are fully used
+    percentiles: tuple of float
+        percentiles of the histogram used as low and high levels with auto levels
+    tolerance: float
+        relative change of the auto levels (with respect to the level range) below which the table
+        is not recomputed
+    """
+
+    def __init__(self, curve: str = 'linear', gamma: float = 0.5, auto_levels: bool = True,
+                 levels: Tuple[int, int] = (0, 0), n_samples: int = 1 << 16,
+                 percentiles: Tuple[float, float] = (0.1, 99.9), tolerance: float = 0.02):
+        if curve not in DISPLAY_CURVES:
+            raise ValueError(f'Unknown display curve {curve}, should be one of {DISPLAY_CURVES}')
+        self.curve = curve
+        self.gamma = gamma
+        self.auto_levels = auto_levels
+        self.fixed_levels = levels
+        self.n_samples = n_samples
+        self.percentiles = percentiles
+        self.tolerance = tolerance
+
+        self.bit_depth: int = None
+        self.levels: Tuple[int, int] = None
+        self.lut: np.ndarray = None
+
+    def set_bit_depth(self, bit_depth: int):
+        self.bit_depth = bit_depth
+        low, high = self.fixed_levels
+        if high <= low:
+            low, high = 0, (1 << bit_depth) - 1
+        self.build(low, high)
+
+    def build(self, low: int, high: int):
+        """Compute the table mapping every value of the bit depth to [0, 255]"""
+        high = max(high, low + 1)
+        self.levels = (low, high)
+        values = np.clip((np.arange(1 << self.bit_depth, dtype=np.float64) - low) / (high - low), 0., 1.)
+        if self.curve == 'gamma':
+            values **= self.gamma
+        elif self.curve == 'log':
+            values = np.log1p(LOG_DYNAMIC * values) / np.log1p(LOG_DYNAMIC)
+        self.lut = np.round(values * 255).astype(np.uint8)
+
+    def compute_levels(self, frame: np.ndarray) -> Tuple[int, int]:
+        """Get the levels from the percentiles of the histogram of the subsampled frame"""
+        stride = max(1, int(np.sqrt(frame.shape[0] * frame.shape[1] / self.n_samples)))
+        sample = frame[::stride, ::stride]
+        cumulative = np.cumsum(np.bincount(sample.ravel(), minlength=1 << self.bit_depth))
+        low = np.searchsorted(cumulative, cumulative[-1] * self.percentiles[0] / 100, side='right')
+        high = np.searchsorted(cumulative, cumulative[-1] * self.percentiles[1] / 100, side='left')
+        return int(low), int(high)
+
+    def update_levels(self, frame: np.ndarray):
+        low, high = self.compute_levels(frame)
+        tolerance = self.tolerance * (self.levels[1] - self.levels[0])
+        if abs(low - self.levels[0]) > tolerance or abs(high - self.levels[1]) > tolerance:
+            self.build(low, high)
+
+    def convert(self, frame: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Map an integer frame into the preallocated uint8 array out"""
+        if self.auto_levels:
+            self.update_levels(frame)
+        return np.take(self.lut, frame, out=out, mode='clip')
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+Asynchronous writes of node values into the remote device of an ImageAcquirer
+
+@author: Sebastien Weber
+"""
+import threading
+
+from qtpy import QtCore
+
+from harvesters.core import ImageAcquirer
+
+from pymodaq_plugins_genicam.hardware.nodes import write_feature
+
+
+class FeatureWriter(QtCore.QObject):
+    """Write node values from a dedicated thread
+
+    Successive requests on the same node are coalesced: only the last requested value is written
+    if the previous ones have not been processed yet. Nodes writable while streaming are written
+    without interrupting the acquisition, the others stop the stream, are written and the stream is
+    restarted.
+
+    Signals
+    -------
+    value_set: (str, object)
+        the name of the node and its value as read back from the device once written
+    write_error: (str, str)
+        the name of the node and the error message if the write failed
+    """
+    value_set = QtCore.Signal(str, object)
+    write_error = QtCore.Signal(str, str)
+    _wake = QtCore.Signal()
+
+    def __init__(self, controller: ImageAcquirer):
+        super().__init__()
+        self.controller = controller
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread: QtCore.QThread = None
+        self._wake.connect(self._process)
+
+    def start(self):
+        self._thread = QtCore.QThread()
+        self.moveToThread(self._thread)
+        self._thread.start()
+
+    def quit(self):
+        if self._thread is not None:
+            self._thread.quit()
+            self._thread.wait()
+            self._thread = None
+
+    def request(self, name: str, value):
+        """Ask for a node to be set to a given value, returns immediately"""
+        with self._lock:
+            idle = len(self._pending) == 0
+            self._pending[name] = value
+        if idle:
+            self._wake.emit()
+
+    def write(self, name: str, value):
+        """Write synchronously a value into a node and return the actually set value"""
+        return write_feature(self.controller, name, value)
+
+    @QtCore.Slot()
+    def _process(self):
+        while True:
+            with self._lock:
+                if len(self._pending) == 0:
+                    return
+                name = next(iter(self._pending))
+                value = self._pending.pop(name)
+            try:
+                value_set = self.write(name, value)
+            except Exception as e:
+                self.write_error.emit(name, str(e))
+                continue
+            with self._lock:
+                superseded = name in self._pending
+            if not superseded:
+                self.value_set.emit(name, value_set)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+Frame rate governor: limit the acquisition frame rate of a camera to what the host pipeline can
+process
+
+@author: Sebastien Weber
+"""
+import time
+from typing import Dict
+
+from harvesters.core import ImageAcquirer
+
+from pymodaq.utils.logger import set_logger, get_module_name
+
+from pymodaq_plugins_genicam.hardware.nodes import is_writable
+from pymodaq_plugins_genicam.hardware.transport import get_node
+
+logger = set_logger(get_module_name(__file__))
+
+LOSS_STATISTICS = ['lost', 'underruns']  # keys of the stream statistics counting lost frames
+
+
+class FrameRateGovernor:
+    """Adapt the frame rate of the camera from the processing time per frame, the depth of the
+    harvesters fetch queue and the lost buffers
+
+    The sustainable rate is the headroom divided by the mean processing time of a frame. The rate
+    of the device is limited to it, reduced further (backoff) when frames are processed slower
+    than produced (harvesters then silently discards the oldest buffers), when the fetch queue is
+    full or buffers are lost, and increased back step by step once the pipeline keeps up. The rate
+    is left untouched when the camera is triggered.
+
+    Parameters
+    ----------
+    controller: ImageAcquirer
+    headroom: float
+        fraction of the processing capacity of the host the camera may use
+    max_rate: float
+        upper limit of the frame rate in Hz, the maximum of the device if 0
+    backoff: float
+        factor applied to the measured rate when the pipeline is overloaded
+    step_up: float
+        factor by which the rate is increased at each update while the pipeline keeps up
+    """
+
+    def __init__(self, controller: ImageAcquirer, headroom: float = 0.8, max_rate: float = 0.,
+                 backoff: float = 0.8, step_up: float = 1.1):
+        self.controller = controller
+        self.headroom = headroom
+        self.max_rate = max_rate
+        self.backoff = backoff
+        self.step_up = step_up
+
+        self.processing_time = 0.
+        self.sustainable_rate: float = None
+        self._n_frames = 0
+        self._last_update = time.perf_counter()
+        self._n_lost: int = None
+
+        node = get_node(controller.remote_device.node_map, 'AcquisitionFrameRateEnable')
+        self._enable_state = node.value if node is not None else None
+        node = get_node(controller.remote_device.node_map, 'AcquisitionFrameRate')
+        self._frame_rate = node.value if node is not None else None
+
+    @property
+    def node_map(self):
+        return self.controller.remote_device.node_map
+
+    def frame_processed(self, duration: float):
+        """Record the time in s spent by the pipeline on a frame"""
+        self._n_frames += 1
+        if self.processing_time == 0.:
+            self.processing_time = duration
+        else:
+            self.processing_time += 0.1 * (duration - self.processing_time)
+
+    def get_frame_rate(self) -> float:
+        """Get the frame rate the device is actually running at (or is set to)"""
+        for name in ['ResultingFrameRate', 'AcquisitionResultingFrameRate', 'AcquisitionFrameRate']:
+            node = get_node(self.node_map, name)
+            if node is not None:
+                return float(node.value)
+        return None
+
+    def set_frame_rate(self, rate: float) -> float:
+        """Enable the frame rate limitation of the device and set its value, without stopping the
+        acquisition
+
+        Returns
+        -------
+        float or None: the frame rate actually set, None if it could not be written
+        """
+        enable = get_node(self.node_map, 'AcquisitionFrameRateEnable')
+        node = get_node(self.node_map, 'AcquisitionFrameRate')
+        try:
+            if enable is not None and not enable.value and is_writable(enable):
+                enable.value = True
+            if node is None or not is_writable(node):
+                return None
+            rate = min(node.max, max(node.min, rate))
+            if rate != node.value:
+                node.value = rate
+            return float(node.value)
+        except Exception as e:
+            logger.debug(f'Could not set the frame rate: {e}')
+            return None
+
+    def update(self, stream_statistics: Dict[str, int]) -> float:
+        """Adjust the frame rate of the device, to be called periodically during the acquisition
+
+        Parameters
+        ----------
+        stream_statistics: dict
+            the current statistics of the data stream (see transport.StreamStatistics)
+
+        Returns
+        -------
+        float or None: the sustainable frame rate, None until frames have been processed
+        """
+        now = time.perf_counter()
+        measured_rate = self._n_frames / max(now - self._last_update, 1e-9)
+        self._n_frames = 0
+        self._last_update = now
+
+        n_lost = sum([stream_statistics.get(key, 0) for key in LOSS_STATISTICS])
+        new_losses = self._n_lost is not None and n_lost > self._n_lost
+        self._n_lost = n_lost
+
+        if self.processing_time == 0. or measured_rate == 0.:
+            return self.sustainable_rate
+        self.sustainable_rate = self.headroom / self.processing_time
+        if self.max_rate > 0:
+            self.sustainable_rate = min(self.sustainable_rate, self.max_rate)
+
+        trigger_mode = get_node(self.node_map, 'TriggerMode')
+        if trigger_mode is not None and trigger_mode.value == 'On':
+            return self.sustainable_rate
+
+        current_rate = self.get_frame_rate()
+        capacity = self.controller.num_filled_buffers_to_hold
+        queue_full = capacity > 1 and self.controller.num_holding_filled_buffers >= capacity
+        behind = current_rate is not None and measured_rate < 0.9 * current_rate
+        if new_losses or queue_full or behind:
+            target = min(self.sustainable_rate, self.backoff * measured_rate)
+        elif current_rate is None or current_rate > self.sustainable_rate:
+            target = self.sustainable_rate
+        else:
+            target = min(self.sustainable_rate, self.step_up * current_rate)
+        if current_rate is None or abs(target - current_rate) > 0.01 * current_rate:
+            self.set_frame_rate(target)
+        return self.sustainable_rate
+
+    def release(self):
+        """Set back the frame rate (and its limitation) of the device as it was before the
+        governor"""
+        node = get_node(self.node_map, 'AcquisitionFrameRate')
+        if node is not None and self._frame_rate is not None:
+            try:
+                if node.value != self._frame_rate:
+                    node.value = self._frame_rate
+            except Exception as e:
+                logger.debug(f'Could not restore the frame rate: {e}')
+        enable = get_node(self.node_map, 'AcquisitionFrameRateEnable')
+        if enable is not None and self._enable_state is not None:
+            try:
+                enable.value = self._enable_state
+            except Exception as e:
+                logger.debug(f'Could not restore the frame rate limitation: {e}')
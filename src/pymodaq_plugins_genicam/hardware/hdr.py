@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+Multi-exposure (HDR) acquisition: cycling of the exposure time from frame to frame and merging of
+each bracket of exposures into a radiance frame
+
+@author: Sebastien Weber
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+from harvesters.core import ImageAcquirer
+
+from pymodaq.utils.logger import set_logger, get_module_name
+
+from pymodaq_plugins_genicam.hardware.transport import get_node
+
+logger = set_logger(get_module_name(__file__))
+
+BRACKET_MODES = ['sequencer', 'software']
+
+
+def parse_exposures(exposures: str) -> List[float]:
+    """Get the sorted exposure times from a comma separated string"""
+    values = sorted({float(value) for value in exposures.replace(';', ',').split(',') if value.strip() != ''})
+    if len(values) == 0 or values[0] <= 0:
+        raise ValueError(f'Invalid exposure times: {exposures}')
+    return values
+
+
+class HDRMerger:
+    """Merge frames taken with different exposure times into a float32 radiance frame
+
+    The radiance of each pixel is the weighted mean of value / exposure over the bracket, the weight
+    decreasing linearly to zero within a margin below the saturation level. Pixels saturated in
+    every frame take the value of the shortest exposure. All buffers are preallocated, the merge
+    is computed in place.
+
+    Parameters
+    ----------
+    exposures: list of float
+        exposure times of the bracket
+    saturation: float
+        pixel value at which the sensor saturates
+    margin: float
+        fraction of the saturation level over which the weight decreases to zero
+    """
+
+    def __init__(self, exposures: List[float], saturation: float, margin: float = 0.1):
+        self.exposures = list(exposures)
+        self.saturation = float(saturation)
+        self.margin = margin
+        self.shape: Tuple[int, int] = None
+        self.n_added = 0
+
+        self.numerator: np.ndarray = None
+        self.denominator: np.ndarray = None
+        self.radiance: np.ndarray = None
+        self._value: np.ndarray = None
+        self._weight: np.ndarray = None
+
+    def allocate(self, shape: Tuple[int, int]):
+        self.shape = tuple(shape)
+        self.numerator = np.zeros(self.shape, dtype=np.float32)
+        self.denominator = np.zeros(self.shape, dtype=np.float32)
+        self.radiance = np.zeros(self.shape, dtype=np.float32)
+        self._value = np.zeros(self.shape, dtype=np.float32)
+        self._weight = np.zeros(self.shape, dtype=np.float32)
+        self.n_added = 0
+
+    def reset(self):
+        self.numerator[...] = 0
+        self.denominator[...] = 0
+        self.n_added = 0
+
+    def add(self, frame: np.ndarray, index: int):
+        """Accumulate a frame taken with the exposure time of a given index of the bracket"""
+        exposure = self.exposures[index]
+        np.copyto(self._value, frame, casting='unsafe')
+        np.subtract(self.saturation, self._value, out=self._weight)
+        self._weight *= 1 / (self.margin * self.saturation)
+        # the shortest exposure keeps a small weight so that no pixel is left without value
+        np.clip(self._weight, 1e-6 if index == 0 else 0., 1., out=self._weight)
+        self._value *= self._weight
+        self.numerator += self._value
+        self._weight *= exposure
+        self.denominator += self._weight
+        self.n_added += 1
+
+    def merge(self, out: np.ndarray = None) -> np.ndarray:
+        """Compute the radiance (value per unit of exposure time) of the frames added since the last
+        reset and reset the accumulators
+
+        Parameters
+        ----------
+        out: np.ndarray
+            float32 array receiving the radiance, the radiance attribute if not given
+        """
+        if out is None:
+            out = self.radiance
+        np.maximum(self.denominator, np.finfo(np.float32).tiny, out=self.denominator)
+        np.divide(self.numerator, self.denominator, out=out)
+        self.reset()
+        return out
+
+
+class ExposureBracket:
+    """Cycle the exposure time of a camera through a list of values, one value per frame
+
+    The device sequencer is used if available: the exposures are cycled by the camera itself.
+    Otherwise the camera is software triggered and the exposure time of the next frame is written
+    before each trigger. A frame lost or received incomplete never comes, so its trigger has to be
+    issued again (see `retrigger` and `get_timeout`).
+
+    Parameters
+    ----------
+    controller: ImageAcquirer
+    exposures: list of float
+        exposure times in µs
+    timeout: float
+        time in s, in addition to the exposure, after which a triggered frame is considered lost
+    """
+
+    def __init__(self, controller: ImageAcquirer, exposures: List[float], timeout: float = 1.):
+        self.controller = controller
+        self.exposures = list(exposures)
+        self.timeout = timeout
+        self.mode: str = None
+        self._index = 0
+        self._first_frame_id = None
+        self._saved = {}
+
+    @property
+    def node_map(self):
+        return self.controller.remote_device.node_map
+
+    def configure(self) -> str:
+        """Set up the camera for the bracket, the acquisition should be stopped
+
+        Returns
+        -------
+        str: the mode used, one of BRACKET_MODES
+        """
+        self.save(['ExposureAuto', 'ExposureTime', 'TriggerSelector'])
+        # the trigger source and mode saved (and restored) are the ones of the FrameStart trigger
+        if 'TriggerSelector' in self._saved:
+            self.node_map.get_node('TriggerSelector').value = 'FrameStart'
+        self.save(['TriggerSource', 'TriggerMode'])
+        if get_node(self.node_map, 'ExposureAuto') is not None:
+            self.node_map.get_node('ExposureAuto').value = 'Off'
+        try:
+            self.configure_sequencer()
+            self.mode = 'sequencer'
+        except Exception as e:
+            logger.debug(f'Sequencer not available: {e}')
+            self.configure_software()
+            self.mode = 'software'
+        return self.mode
+
+    def save(self, names: List[str]):
+        """Keep the current values of the available nodes among names, to be set back by restore"""
+        for name in names:
+            node = get_node(self.node_map, name)
+            if node is not None:
+                self._saved[name] = node.value
+
+    def configure_sequencer(self):
+        node_map = self.node_map
+        node_map.get_node('SequencerMode').value = 'Off'
+        node_map.get_node('SequencerConfigurationMode').value = 'On'
+        try:
+            for ind, exposure in enumerate(self.exposures):
+                node_map.get_node('SequencerSetSelector').value = ind
+                node_map.get_node('ExposureTime').value = exposure
+                node_map.get_node('SequencerPathSelector').value = 0
+                node_map.get_node('SequencerSetNext').value = (ind + 1) % len(self.exposures)
+                node_map.get_node('SequencerTriggerSource').value = 'FrameStart'
+                node_map.get_node('SequencerSetSave').execute()
+            node_map.get_node('SequencerSetStart').value = 0
+        finally:
+            node_map.get_node('SequencerConfigurationMode').value = 'Off'
+        node_map.get_node('SequencerMode').value = 'On'
+
+    def configure_software(self):
+        node_map = self.node_map
+        node_map.get_node('TriggerSelector').value = 'FrameStart'
+        node_map.get_node('TriggerSource').value = 'Software'
+        node_map.get_node('TriggerMode').value = 'On'
+
+    def start(self):
+        """Trigger the first frame of the bracket, to be called once the acquisition is started"""
+        self._index = 0
+        self._first_frame_id = None
+        if self.mode == 'software':
+            self.trigger(0)
+
+    def trigger(self, index: int):
+        self.node_map.get_node('ExposureTime').value = self.exposures[index]
+        self.node_map.get_node('TriggerSoftware').execute()
+
+    def next(self, frame_id: int = None) -> int:
+        """Get the index in the bracket of the exposure of a just received frame (and trigger the
+        next frame in software mode)"""
+        if self.mode == 'sequencer':
+            if frame_id is None:
+                index = self._index
+            else:  # robust to lost frames
+                if self._first_frame_id is None:
+                    self._first_frame_id = frame_id
+                index = (frame_id - self._first_frame_id) % len(self.exposures)
+            self._index = (index + 1) % len(self.exposures)
+            return index
+        index = self._index
+        self._index = (index + 1) % len(self.exposures)
+        self.trigger(self._index)
+        return index
+
+    def retrigger(self):
+        """Trigger again the pending frame of the bracket (software mode), to be called when it has
+        been lost or received incomplete"""
+        if self.mode == 'software':
+            self.trigger(self._index)
+
+    def get_timeout(self) -> int:
+        """Get the time in ms after which the pending frame should be considered lost"""
+        return int(1000 * self.timeout + 2e-3 * self.exposures[self._index])
+
+    def restore(self):
+        """Switch the sequencer or the software trigger off and set back the exposure settings"""
+        try:
+            if self.mode == 'sequencer':
+                self.node_map.get_node('SequencerMode').value = 'Off'
+            if 'TriggerSelector' in self._saved:
+                self.node_map.get_node('TriggerSelector').value = 'FrameStart'
+            for name in ['TriggerSource', 'TriggerMode', 'ExposureTime', 'ExposureAuto', 'TriggerSelector']:
+                if name in self._saved:
+                    self.node_map.get_node(name).value = self._saved[name]
+        except Exception as e:
+            logger.warning(f'Could not restore the exposure settings: {e}')
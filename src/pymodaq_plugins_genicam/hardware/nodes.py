@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+GenApi typedefs and small helpers to deal with the nodes of a GenICam node map
+
+@author: Sebastien Weber
+"""
+from pymodaq.utils.enums import BaseEnum
+
+
+class EInterfaceType(BaseEnum):
+    """
+    typedef for interface type
+    """
+    intfIValue = 0       #: IValue interface
+    intfIBase = 1        #: IBase interface
+    intfIInteger = 2     #: IInteger interface
+    intfIBoolean = 3     #: IBoolean interface
+    intfICommand = 4     #: ICommand interface
+    intfIFloat = 5       #: IFloat interface
+    intfIString = 6      #: IString interface
+    intfIRegister = 7    #: IRegister interface
+    intfICategory = 8    #: ICategory interface
+    intfIEnumeration = 9  #: IEnumeration interface
+    intfIEnumEntry = 10   #: IEnumEntry interface
+    intfIPort = 11  #: IPort interface
+
+
+class EAccessMode(BaseEnum):
+    """
+    typedef for access mode
+    """
+    NI = 0  #: Not implemented
+    NA = 1  #: Not available
+    WO = 2  #: Write only
+    RO = 3  #: Read only
+    RW = 4  #: Read and write
+
+
+READONLY_ACCESS_MODES = [EAccessMode.NI.value, EAccessMode.NA.value, EAccessMode.RO.value]
+
+
+def is_writable(feature) -> bool:
+    """Check if a node can be written in the current state of the device
+
+    Nodes locked while streaming (TLParamsLocked) are reported as read only during acquisition
+    """
+    return feature.get_access_mode() not in READONLY_ACCESS_MODES
+
+
+def coerce_value(feature, value):
+    """Adapt a value to what the node can accept (integer nodes must be a multiple of their
+    increment)"""
+    if feature.node.principal_interface_type == EInterfaceType.intfIInteger.value:
+        inc = feature.inc
+        return int((value // inc) * inc)
+    return value
+
+
+def write_feature(controller, name: str, value):
+    """Write a value into a node of the remote device of an ImageAcquirer and return the actually
+    set value
+
+    Nodes that cannot be written while streaming are written after stopping the acquisition which
+    is then restarted
+    """
+    feature = controller.remote_device.node_map.get_node(name)
+    restart = False
+    if not is_writable(feature) and controller.is_acquiring():
+        controller.stop()
+        restart = True
+    try:
+        feature.value = coerce_value(feature, value)
+    finally:
+        if restart:
+            controller.start(run_as_thread=True)
+    return feature.value
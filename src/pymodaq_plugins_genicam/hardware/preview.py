@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+Low cost previews of the acquired frames, computed in the plugin pipeline and published to the
+GUI (GenICam dashboard extension) through a process wide hub
+
+@author: Sebastien Weber
+"""
+import time
+
+import numpy as np
+from qtpy import QtCore
+
+
+class PreviewHub(QtCore.QObject):
+    """Process wide publisher of the camera previews
+
+    Signals
+    -------
+    preview_ready: (str, dict)
+        the name of the camera module and the preview with keys: image (uint8 ndarray), histogram,
+        bin_edges, fps, frames and dropped
+    """
+    preview_ready = QtCore.Signal(str, object)
+
+
+preview_hub = PreviewHub()
+
+
+class PreviewMaker:
+    """Downsample, rate limit and summarize the frames of a camera
+
+    Parameters
+    ----------
+    name: str
+        the identifier of the camera module used when publishing
+    max_size: int
+        the maximum number of pixels along each dimension of the preview image
+    max_rate: float
+        the maximum publication rate in Hz
+    n_bins: int
+        number of bins of the histogram
+    decay: float
+        weight of the previous histogram when adding the counts of a new frame
+    """
+
+    def __init__(self, name: str, max_size: int = 256, max_rate: float = 10., n_bins: int = 256,
+                 decay: float = 0.5):
+        self.name = name
+        self.max_size = max_size
+        self.period = 1 / max_rate
+        self.n_bins = n_bins
+        self.decay = decay
+
+        self.histogram = np.zeros((n_bins,))
+        self.bin_edges = np.linspace(0, 1, n_bins + 1)
+        self._top = None
+
+        self.n_frames = 0
+        self.n_dropped = 0
+        self.fps = 0.
+        self._last_frame_id = None
+        self._last_frame_time = None
+        self._last_publish_time = 0.
+
+    def reset(self):
+        self.n_frames = 0
+        self.n_dropped = 0
+        self._last_frame_id = None
+        self._last_frame_time = None
+
+    def _count(self, frame_id: int = None):
+        now = time.perf_counter()
+        if self._last_frame_time is not None:
+            self.fps = 0.9 * self.fps + 0.1 / max(now - self._last_frame_time, 1e-9)
+        self._last_frame_time = now
+        if frame_id is not None and self._last_frame_id is not None and frame_id > self._last_frame_id + 1:
+            self.n_dropped += frame_id - self._last_frame_id - 1
+        self._last_frame_id = frame_id
+        self.n_frames += 1
+        return now
+
+    def _update_histogram(self, sample: np.ndarray):
+        top = float(sample.max())
+        if np.issubdtype(sample.dtype, np.integer):
+            top = float(1 << int(top).bit_length())  # next power of two: the bit depth in use
+        if self._top is None or top > self._top:
+            self._top = max(top, 1.)
+            self.bin_edges = np.linspace(0, self._top, self.n_bins + 1)
+            self.histogram[:] = 0
+        counts, _ = np.histogram(sample, bins=self.bin_edges)
+        self.histogram *= self.decay
+        self.histogram += counts
+
+    def process(self, frame: np.ndarray, frame_id: int = None):
+        """Count the frame and publish a preview if the last one is older than the publication
+        period"""
+        now = self._count(frame_id)
+        if now - self._last_publish_time < self.period:
+            return
+        self._last_publish_time = now
+
+        step = max(1, int(np.ceil(max(frame.shape[0], frame.shape[1]) / self.max_size)))
+        small = frame[::step, ::step]
+        self._update_histogram(small)
+        low = float(small.min())
+        high = float(small.max())
+        image = ((small - low) * (255 / max(high - low, 1e-12))).astype(np.uint8)
+        preview_hub.preview_ready.emit(self.name, dict(image=image, histogram=self.histogram.copy(),
+                                                       bin_edges=self.bin_edges, fps=self.fps,
+                                                       frames=self.n_frames, dropped=self.n_dropped))
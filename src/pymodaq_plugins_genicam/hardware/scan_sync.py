@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+Assignment of camera frames to scan positions for hardware-timed scans: the actuator moves
+continuously while the camera is triggered (or free running), and each frame is attributed to a
+scan position using either the camera frame counter or the device timestamp.
+
+@author: Sebastien Weber
+"""
+from typing import Optional
+
+import numpy as np
+
+SYNC_MODES = ['counter', 'timestamp']
+
+
+class FramePositionMapper:
+    """Map incoming frames to the index of a scan position
+
+    Parameters
+    ----------
+    positions: np.ndarray
+        the 1D array of scan positions, equally spaced and in the order of the motion
+    mode: str
+        either 'counter': the camera is triggered by the actuator (position compare output) so the
+        n-th frame since the start of the scan belongs to the n-th position; or 'timestamp': the
+        acquisition is started by a hardware trigger of the actuator at the beginning of its motion
+        (so that the first frame is taken at the first position), then the camera is free running
+        while the actuator moves at constant velocity and the position is computed from the device
+        timestamp of the frame relative to the first one
+    velocity: float
+        the actuator velocity in units of the positions per second (used to compute the position
+        in 'timestamp' mode and the expected time between frames in both modes)
+    """
+
+    def __init__(self, positions: np.ndarray, mode: str = 'counter', velocity: float = 1.):
+        if mode not in SYNC_MODES:
+            raise ValueError(f'Unknown synchronization mode: {mode}, should be one of {SYNC_MODES}')
+        self.positions = np.asarray(positions, dtype=float)
+        self.mode = mode
+        self.velocity = velocity
+        if self.positions.size > 1:
+            self._step = self.positions[1] - self.positions[0]
+        else:
+            self._step = 0.
+        self._first_frame_id: Optional[int] = None
+        self._first_timestamp: Optional[int] = None
+        self.filled = np.zeros((self.positions.size,), dtype=bool)
+
+    def reset(self):
+        self._first_frame_id = None
+        self._first_timestamp = None
+        self.filled[:] = False
+
+    @property
+    def n_positions(self) -> int:
+        return self.positions.size
+
+    @property
+    def frame_period(self) -> float:
+        """Expected time in s between the frames of two consecutive positions"""
+        if self.velocity <= 0:
+            return 0.
+        return abs(self._step) / self.velocity
+
+    @property
+    def n_missing(self) -> int:
+        """Number of positions that did not receive any frame"""
+        return int(self.n_positions - np.count_nonzero(self.filled))
+
+    def is_complete(self, frame_id: int = None, timestamp_ns: int = None) -> bool:
+        """Check if the scan is over, either because every position has been filled or because
+        the last received frame is beyond the last position (some frames have been lost). If the
+        frames of the last positions are lost, the scan has to be ended on a timeout based on
+        `frame_period`."""
+        if self.filled.all():
+            return True
+        if self.mode == 'counter' and frame_id is not None and self._first_frame_id is not None:
+            return frame_id - self._first_frame_id >= self.n_positions - 1
+        if self.mode == 'timestamp' and timestamp_ns is not None and self._first_timestamp is not None:
+            return self._position_index_from_time(timestamp_ns) >= self.n_positions - 1
+        return False
+
+    def _position_index_from_time(self, timestamp_ns: int) -> int:
+        if self._step == 0.:
+            return 0
+        position = self.positions[0] + \
+            np.sign(self._step) * self.velocity * (timestamp_ns - self._first_timestamp) * 1e-9
+        return int(np.round((position - self.positions[0]) / self._step))
+
+    def map(self, frame_id: int = None, timestamp_ns: int = None) -> Optional[int]:
+        """Get the index of the scan position corresponding to a given frame
+
+        Parameters
+        ----------
+        frame_id: int
+            the frame counter as given by the device/GenTL buffer
+        timestamp_ns: int
+            the device timestamp of the frame in nanoseconds
+
+        Returns
+        -------
+        int or None: the position index or None if the frame doesn't belong to the scan
+        """
+        if self.mode == 'counter':
+            if frame_id is None:
+                raise ValueError('A frame id is needed in counter mode')
+            if self._first_frame_id is None:
+                self._first_frame_id = frame_id
+            index = frame_id - self._first_frame_id
+        else:
+            if timestamp_ns is None:
+                raise ValueError('A timestamp is needed in timestamp mode')
+            if self._first_timestamp is None:
+                self._first_timestamp = timestamp_ns
+            index = self._position_index_from_time(timestamp_ns)
+        if 0 <= index < self.n_positions:
+            self.filled[index] = True
+            return index
+        return None
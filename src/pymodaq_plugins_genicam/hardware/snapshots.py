@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+Named snapshots of a camera configuration. They are restored in a single round-trip with the
+device UserSets when the snapshot has been saved to the device, or else with a GenApi
+concatenated write (feature streaming). An ordered node by node write is the last resort.
+
+@author: Sebastien Weber
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from harvesters.core import ImageAcquirer
+
+from pymodaq.utils.config import get_set_local_dir
+from pymodaq.utils.logger import set_logger, get_module_name
+
+from pymodaq_plugins_genicam.hardware.nodes import EInterfaceType, is_writable
+
+logger = set_logger(get_module_name(__file__))
+
+SNAPSHOT_FOLDER = Path(get_set_local_dir()).joinpath('genicam_snapshots')
+
+VALUE_INTERFACES = [EInterfaceType.intfIBoolean.value, EInterfaceType.intfIInteger.value,
+                    EInterfaceType.intfIFloat.value, EInterfaceType.intfIString.value,
+                    EInterfaceType.intfIEnumeration.value]
+
+# features changing the range of the others, written first
+STRUCTURAL_FEATURES = ['PixelFormat', 'BinningHorizontal', 'BinningVertical', 'DecimationHorizontal',
+                       'DecimationVertical', 'ReverseX', 'ReverseY']
+
+
+def get_snapshot_path(name: str) -> Path:
+    return SNAPSHOT_FOLDER.joinpath(f'{name}.json')
+
+
+def list_snapshots() -> List[str]:
+    if not SNAPSHOT_FOLDER.is_dir():
+        return []
+    return sorted([path.stem for path in SNAPSHOT_FOLDER.glob('*.json')])
+
+
+def get_user_sets(controller: ImageAcquirer) -> List[str]:
+    """Get the names of the user sets the configuration can be saved into (the Default one is read
+    only)"""
+    try:
+        selector = controller.remote_device.node_map.get_node('UserSetSelector')
+        controller.remote_device.node_map.get_node('UserSetSave')
+        return [entry.symbolic for entry in selector.entries if entry.symbolic != 'Default']
+    except Exception:
+        return []
+
+
+def sort_features(features: List[Tuple[str, int, str]]) -> List[Tuple[str, int, str]]:
+    """Order features so that the ones others depend on are written first: selectors, then
+    features defining the image format, then modes and switches (enumerations and booleans,
+    e.g. ExposureAuto before ExposureTime) and finally values. The node map order is kept otherwise.
+
+    Parameters
+    ----------
+    features: list of tuple
+        name, principal interface type and value (as string) of each feature
+    """
+    def rank(item):
+        name, interface_type, _ = item
+        if name.endswith('Selector'):
+            return 0
+        if name in STRUCTURAL_FEATURES:
+            return 1
+        if interface_type in [EInterfaceType.intfIEnumeration.value, EInterfaceType.intfIBoolean.value]:
+            return 2
+        return 3
+    return sorted(features, key=rank)  # sorted is stable
+
+
+def read_features(controller: ImageAcquirer) -> List[Tuple[str, int, str]]:
+    """Read the value (as a string) of every writable feature of the remote device"""
+    features = []
+    for feature in controller.remote_device.node_map.nodes:
+        try:
+            node = feature.node
+            if not node.is_feature or node.principal_interface_type not in VALUE_INTERFACES:
+                continue
+            if node.name.startswith('UserSet') or not is_writable(feature):
+                continue
+            features.append((node.name, node.principal_interface_type, feature.to_string()))
+        except Exception:
+            pass
+    return sort_features(features)
+
+
+def batch_write(controller: ImageAcquirer, features: List[Tuple[str, int, str]], n_passes: int = 3) -> int:
+    """Write features node by node in the given order, skipping the ones already at the right
+    value. Writes failing because of a dependency not yet satisfied are retried in a next pass.
+
+    Returns
+    -------
+    int: the number of features that could not be written
+    """
+    node_map = controller.remote_device.node_map
+    remaining = list(features)
+    for _ in range(n_passes):
+        failed = []
+        for item in remaining:
+            name, _, value = item
+            try:
+                feature = node_map.get_node(name)
+                if feature.to_string() != value:
+                    feature.from_string(value)
+            except Exception:
+                failed.append(item)
+        remaining = failed
+        if len(remaining) == 0:
+            break
+    for name, _, _ in remaining:
+        logger.warning(f'Could not restore the feature {name}')
+    return len(remaining)
+
+
+def write_features(controller: ImageAcquirer, features: List[Tuple[str, int, str]]) -> str:
+    """Write a set of features, in one transaction if the node map supports concatenated writes
+
+    Returns
+    -------
+    str: the method used, either 'concatenated' or 'batch'
+    """
+    try:
+        result = controller.remote_device.node_map.concatenated_write(
+            {name: value for name, _, value in features}, feature_streaming=True)
+        if result.was_successful:
+            return 'concatenated'
+        logger.debug(f'Concatenated write failed: {result.messages}')
+    except Exception as e:
+        logger.debug(f'Concatenated write not available: {e}')
+    batch_write(controller, features)
+    return 'batch'
+
+
+def get_device_id(controller: ImageAcquirer) -> Dict[str, str]:
+    node_map = controller.remote_device.node_map
+    device_id = {}
+    for key, name in [('model', 'DeviceModelName'), ('serial', 'DeviceSerialNumber')]:
+        try:
+            device_id[key] = node_map.get_node(name).value
+        except Exception:
+            device_id[key] = ''
+    return device_id
+
+
+def save_snapshot(controller: ImageAcquirer, name: str, user_set: str = None) -> Path:
+    """Save the current configuration of the camera under a given name
+
+    Parameters
+    ----------
+    controller: ImageAcquirer
+    name: str
+        the name of the snapshot
+    user_set: str
+        if given, the configuration is also stored into this user set of the device
+
+    Returns
+    -------
+    Path: the path of the snapshot file
+    """
+    snapshot = get_device_id(controller)
+    snapshot['user_set'] = None
+    snapshot['features'] = read_features(controller)
+    if user_set is not None:
+        node_map = controller.remote_device.node_map
+        node_map.get_node('UserSetSelector').value = user_set
+        node_map.get_node('UserSetSave').execute()
+        snapshot['user_set'] = user_set
+
+    SNAPSHOT_FOLDER.mkdir(parents=True, exist_ok=True)
+    path = get_snapshot_path(name)
+    with open(path, 'w') as file:
+        json.dump(snapshot, file, indent=1)
+    return path
+
+
+def load_snapshot(controller: ImageAcquirer, name: str) -> str:
+    """Restore a named configuration, the acquisition should be stopped
+
+    Returns
+    -------
+    str: the method used, 'user_set', 'concatenated' or 'batch'
+    """
+    with open(get_snapshot_path(name), 'r') as file:
+        snapshot = json.load(file)
+
+    if snapshot['user_set'] is not None and \
+            get_device_id(controller)['serial'] == snapshot['serial']:
+        try:
+            node_map = controller.remote_device.node_map
+            node_map.get_node('UserSetSelector').value = snapshot['user_set']
+            node_map.get_node('UserSetLoad').execute()
+            return 'user_set'
+        except Exception as e:
+            logger.warning(f'Could not load the user set {snapshot["user_set"]}: {e}')
+
+    return write_features(controller, [tuple(feature) for feature in snapshot['features']])
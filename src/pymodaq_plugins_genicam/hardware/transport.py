@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Created the 19/10/2026
+
+GigE Vision transport tuning (packet size, inter-packet delay, throughput limit) and GenTL data
+stream statistics
+
+@author: Sebastien Weber
+"""
+from typing import Dict, List, Optional
+
+from harvesters.core import ImageAcquirer, Callback
+
+from pymodaq.utils.logger import set_logger, get_module_name
+
+logger = set_logger(get_module_name(__file__))
+
+PACKET_SIZES = [9000, 8192, 6000, 4000, 3000, 1500]  # jumbo frames down to standard MTU
+PACKET_OVERHEAD = 14 + 20 + 8 + 8 + 4  # ethernet, IP, UDP, GVSP headers and frame CRC (bytes)
+
+# first node found in the data stream node map is used, names differ between GenTL producers
+STREAM_STATISTICS_NODES: Dict[str, List[str]] = {
+    'delivered': ['StreamDeliveredFrameCount'],
+    'incomplete': ['StreamIncompleteFrameCount'],
+    'lost': ['StreamLostFrameCount', 'StreamDroppedFrameCount'],
+    'resends': ['StreamPacketResendCount', 'StreamResendRequestCount', 'StreamResendPacketCount'],
+    'underruns': ['StreamBufferUnderrunCount'],
+}
+
+
+def get_node(node_map, name: str):
+    """Get a node if it exists and is available, None otherwise"""
+    try:
+        node = node_map.get_node(name)
+        node.value  # raises if not available
+        return node
+    except Exception:
+        return None
+
+
+def is_gige(controller: ImageAcquirer) -> bool:
+    return get_node(controller.remote_device.node_map, 'GevSCPSPacketSize') is not None
+
+
+def grab_test_frame(controller: ImageAcquirer, timeout: float) -> bool:
+    """Acquire a single frame and tell if it has been received complete"""
+    controller.start()
+    try:
+        buffer = controller.try_fetch(timeout=timeout)
+        if buffer is not None:
+            buffer.queue()
+        return buffer is not None
+    finally:
+        controller.stop()
+
+
+def can_stream(controller: ImageAcquirer) -> bool:
+    """Check that frames can arrive without external action (the camera is not waiting for
+    triggers)"""
+    trigger_mode = get_node(controller.remote_device.node_map, 'TriggerMode')
+    return trigger_mode is None or trigger_mode.value != 'On'
+
+
+def probe_packet_size(controller: ImageAcquirer, timeout: float = 1.) -> Optional[int]:
+    """Set the largest stream packet size with which complete frames are received
+
+    Packets larger than the MTU of the path are dropped by the network, the do not fragment flag
+    (GevSCPSDoNotFragment) makes sure they are not fragmented on the way instead. A test frame is
+    first grabbed with the standard packet size to check that frames can be received at all, then
+    the largest working size is found by bisection over the candidate sizes.
+
+    Returns
+    -------
+    int or None: the packet size in bytes or None if no tested size did work, in which case the
+        original packet size is restored
+    """
+    node_map = controller.remote_device.node_map
+    node = node_map.get_node('GevSCPSPacketSize')
+    original_size = node.value
+    if not can_stream(controller):
+        logger.info('The camera is triggered, the packet size cannot be probed')
+        return None
+    do_not_fragment = get_node(node_map, 'GevSCPSDoNotFragment')
+    if do_not_fragment is not None:
+        do_not_fragment.value = True
+
+    def works(size: int) -> bool:
+        try:
+            node.value = size
+            return grab_test_frame(controller, timeout)
+        except Exception as e:
+            logger.debug(f'Packet size {size} failed: {e}')
+            return False
+
+    sizes = sorted({int(min(node.max, max(node.min, size)) // node.inc * node.inc)
+                    for size in [node.max] + PACKET_SIZES})
+    # the standard ethernet MTU (or the smallest size) works if frames can be received at all
+    low = max([ind for ind, size in enumerate(sizes) if size <= PACKET_SIZES[-1]], default=0)
+    if not works(sizes[low]):
+        node.value = original_size
+        return None
+    high = len(sizes) - 1
+    while low < high:  # sizes[low] works, find the largest working one
+        middle = (low + high + 1) // 2
+        if works(sizes[middle]):
+            low = middle
+        else:
+            high = middle - 1
+    node.value = sizes[low]
+    return node.value
+
+
+def get_link_speed(controller: ImageAcquirer) -> Optional[float]:
+    """Get the link speed of the device in bytes per second"""
+    node_map = controller.remote_device.node_map
+    node = get_node(node_map, 'DeviceLinkSpeed')  # Bps
+    if node is not None:
+        return float(node.value)
+    node = get_node(node_map, 'GevLinkSpeed')  # Mbps
+    if node is not None:
+        return node.value * 1e6 / 8
+    return None
+
+
+def set_throughput(controller: ImageAcquirer, link_usage: float = 0.9) -> Optional[float]:
+    """Limit the device throughput to a fraction of the link bandwidth
+
+    DeviceLinkThroughputLimit is used if available, otherwise the inter-packet delay (GevSCPD) is
+    computed from the packet size so that the same bandwidth is not exceeded.
+
+    Returns
+    -------
+    float or None: the throughput limit in bytes per second, None if it could not be set
+    """
+    node_map = controller.remote_device.node_map
+    link_speed = get_link_speed(controller)
+    if link_speed is None:
+        return None
+    throughput = link_usage * link_speed
+
+    limit = get_node(node_map, 'DeviceLinkThroughputLimit')
+    if limit is not None:
+        mode = get_node(node_map, 'DeviceLinkThroughputLimitMode')
+        if mode is not None:
+            mode.value = 'On'
+        limit.value = int(min(limit.max, max(limit.min, throughput)))
+        return float(limit.value)
+
+    delay = get_node(node_map, 'GevSCPD')
+    tick_frequency = get_node(node_map, 'GevTimestampTickFrequency')
+    if delay is not None and tick_frequency is not None:
+        packet = node_map.get_node('GevSCPSPacketSize').value + PACKET_OVERHEAD
+        ticks = (packet / throughput - packet / link_speed) * tick_frequency.value
+        delay.value = int(min(delay.max, max(delay.min, ticks)))
+        return throughput
+    return None
+
+
+def tune_gige_transport(controller: ImageAcquirer, link_usage: float = 0.9, timeout: float = 1.) -> dict:
+    """Probe the packet size and set the throughput limit of a GigE Vision camera
+
+    Returns
+    -------
+    dict: with keys packet_size (bytes) and throughput (bytes/s), empty if the device is not a
+        GigE Vision one
+    """
+    if not is_gige(controller):
+        return {}
+    packet_size = probe_packet_size(controller, timeout)
+    if packet_size is None:
+        logger.warning('No packet size allowed to receive a complete frame')
+    return dict(packet_size=packet_size, throughput=set_throughput(controller, link_usage))
+
+
+class StreamStatistics(Callback):
+    """Gather the statistics of the first data stream of an ImageAcquirer
+
+    Incomplete buffers are counted from the harvesters INCOMPLETE_BUFFER event on top of the
+    counters exposed by the GenTL producer in the data stream node map. harvesters keeps a single
+    callback per event, other objects interested in incomplete buffers are registered with
+    `add_listener`.
+    """
+
+    def __init__(self, controller: ImageAcquirer):
+        super().__init__()
+        self.controller = controller
+        self.n_incomplete = 0
+        self._listeners: List[Callback] = []
+        self._nodes = {}
+        node_map = controller.data_streams[0].node_map if len(controller.data_streams) != 0 else None
+        if node_map is not None:
+            for key, names in STREAM_STATISTICS_NODES.items():
+                for name in names:
+                    node = get_node(node_map, name)
+                    if node is not None:
+                        self._nodes[key] = node
+                        break
+        controller.add_callback(ImageAcquirer.Events.INCOMPLETE_BUFFER, self)
+
+    def add_listener(self, callback: Callback):
+        """Have a callback also called on each incomplete buffer"""
+        self._listeners.append(callback)
+
+    def emit(self, context):
+        self.n_incomplete += 1
+        for listener in self._listeners:
+            listener.emit(context)
+
+    def reset(self):
+        self.n_incomplete = 0
+
+    def get(self) -> Dict[str, int]:
+        """Get the current values of the statistics available for this producer"""
+        stats = {key: int(node.value) for key, node in self._nodes.items()}
+        stats['incomplete'] = max(stats.get('incomplete', 0), self.n_incomplete)
+        if 'underruns' not in stats:
+            try:
+                stats['underruns'] = int(self.controller.data_streams[0].module.num_underrun)
+            except Exception:
+                pass
+        return stats
@@ -0,0 +1,11 @@
+import pytest
+from qtpy import QtWidgets
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """A single QApplication for the whole session (Qt objects of pymodaq_gui live as long as it)"""
+    app = QtWidgets.QApplication.instance()
+    if app is None:
+        app = QtWidgets.QApplication([])
+    yield app
@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+import pytest
+
+from pymodaq_plugins_genicam.hardware.analysis import AnalysisPipeline, find_peak, centroid, register_analysis
+
+
+@register_analysis('Mean', ['mean'])
+def mean(frame: np.ndarray):  # registered by a module the workers never import by themselves
+    return [float(frame.mean())]
+
+
+def failing(frame: np.ndarray):
+    raise RuntimeError('bad frame')
+
+
+def test_builtin_analyses():
+    frame = np.zeros((20, 30), dtype=np.uint16)
+    frame[5, 7] = 100
+    assert find_peak(frame) == (7., 5., 100.)
+    x, y, sigma_x, sigma_y = centroid(frame)
+    assert (x, y, sigma_x, sigma_y) == pytest.approx((7., 5., 0., 0.))
+
+
+def test_pipeline_preserves_order():
+    pipeline = AnalysisPipeline('Peak', n_workers=2, policy='block')
+    try:
+        results = []
+        for ind in range(10):
+            frame = np.zeros((8, 16), dtype=np.uint16)
+            frame[ind % 8, ind] = 1000 + ind
+            assert pipeline.submit(frame)
+            results.extend(pipeline.collect())
+        start = time.perf_counter()
+        while len(results) < 10 and time.perf_counter() - start < 10:
+            results.extend(pipeline.collect())
+            time.sleep(0.01)
+        assert [result[0] for result in results] == list(range(10))
+        assert pipeline.n_skipped == 0
+    finally:
+        pipeline.close()
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        AnalysisPipeline('Peak', policy='drop')
+
+
+def test_pipeline_reallocates_slots():
+    pipeline = AnalysisPipeline('Peak', n_workers=1, policy='block')
+    try:
+        results = []
+        for shape in [(8, 16), (4, 6), (8, 16)]:
+            frame = np.zeros(shape, dtype=np.uint16)
+            frame[2, 3] = 10
+            assert pipeline.submit(frame)
+        pipeline._wait_all()
+        results.extend(pipeline.collect())
+        assert results == [[3., 2., 10.]] * 3
+    finally:
+        pipeline.close()
+
+
+def test_pipeline_runtime_registered_analysis():
+    pipeline = AnalysisPipeline('Mean', n_workers=1, policy='block')
+    try:
+        assert pipeline.submit(np.full((4, 6), 3, dtype=np.uint16))
+        pipeline._wait_all()
+        assert pipeline.collect() == [[3.]]
+    finally:
+        pipeline.close()
+
+
+def test_pipeline_reports_errors():
+    pipeline = AnalysisPipeline(f'{__name__}:failing', n_workers=1, policy='block')
+    try:
+        assert pipeline.submit(np.zeros((4, 6), dtype=np.uint16))
+        pipeline._wait_all()
+        assert np.isnan(pipeline.collect()[0][0])
+        assert pipeline.n_errors == 1 and pipeline.last_error == 'bad frame'
+    finally:
+        pipeline.close()
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+from pymodaq_plugins_genicam.hardware import discovery
+
+
+def test_find_cti_files(tmp_path, monkeypatch):
+    env_folder = tmp_path / 'env'
+    config_folder = tmp_path / 'config'
+    for folder in (env_folder, config_folder):
+        folder.mkdir()
+        (folder / 'producer.cti').touch()
+        (folder / 'readme.txt').touch()
+    (config_folder / 'other.cti').touch()
+    monkeypatch.setenv(discovery.GENTL_PATH_VARIABLE, str(env_folder))
+    monkeypatch.setattr(discovery, 'VENDOR_CTI_FOLDERS', [])
+
+    cti_files = discovery.find_cti_files([str(config_folder), str(tmp_path / 'missing')])
+    assert [Path(file).name for file in cti_files] == ['producer.cti', 'other.cti']
+    assert Path(cti_files[0]).parent.name == 'env'
+
+
+class FakeInterface:
+    def __init__(self, models: list):
+        self.models = models
+        self.module = self
+        self.device_info_list = []
+
+    def update_device_info_list(self, timeout):
+        self.device_info_list = [type('DevInfo', (), {'model': model})() for model in self.models]
+
+
+class FakeHarvester:
+    def __init__(self, interfaces: list, acquirers_valid: list):
+        self._ifaces = interfaces
+        self.image_acquirers = [type('Acquirer', (), {'is_valid': lambda _, valid=valid: valid})()
+                                for valid in acquirers_valid]
+        self.device_info_list = []
+        self.timeout_for_update = 100
+        self.n_updates = 0
+
+    def update(self):
+        self.n_updates += 1
+
+
+def test_rescan_with_opened_camera(monkeypatch):
+    empty_interface = FakeInterface([])
+    harv = FakeHarvester([FakeInterface(['Cam0']), empty_interface], acquirers_valid=[True])
+    monkeypatch.setattr(discovery, 'harv', harv)
+    monkeypatch.setattr(discovery, 'DeviceInfo',
+                        lambda module, parent: type('DeviceInfo', (), {'model': module.model})())
+    monkeypatch.setattr(discovery, 'devices_names', [])
+
+    assert discovery.rescan_devices() == ['Cam0']
+    empty_interface.models.append('Cam1')  # plugged on an interface that had no device
+    assert discovery.rescan_devices() == ['Cam0', 'Cam1']
+    assert harv.n_updates == 0
+
+    harv.image_acquirers[0].is_valid = lambda: False  # the camera has been closed (destroyed)
+    discovery.rescan_devices()
+    assert harv.n_updates == 1
@@ -0,0 +1,43 @@
+import numpy as np
+
+from pymodaq_plugins_genicam.hardware.display import DisplayLUT, get_bit_depth
+
+
+def test_get_bit_depth():
+    assert get_bit_depth('Mono12p') == 12
+    assert get_bit_depth('Mono16') == 16
+    assert get_bit_depth('BayerRG') == 8
+    assert get_bit_depth('BayerRG8') == 8
+    assert get_bit_depth('YCbCr422_8') == 8
+    assert get_bit_depth('YCbCr709_422_8') == 8
+    assert get_bit_depth('RGB10p32') == 10
+    assert get_bit_depth('Coord3D_ABC16') == 16
+
+
+def test_linear_lut():
+    lut = DisplayLUT('linear', auto_levels=False)
+    lut.set_bit_depth(12)
+    frame = np.array([[0, 4095, 2047]], dtype=np.uint16)
+    out = np.zeros(frame.shape, dtype=np.uint8)
+    lut.convert(frame, out=out)
+    assert out.tolist() == [[0, 255, 127]]
+
+
+def test_auto_levels():
+    lut = DisplayLUT('linear', auto_levels=True, percentiles=(0, 100))
+    lut.set_bit_depth(16)
+    frame = np.linspace(1000, 2000, 100 * 100).astype(np.uint16).reshape((100, 100))
+    out = np.zeros(frame.shape, dtype=np.uint8)
+    lut.convert(frame, out=out)
+    assert lut.levels == (1000, 2000)
+    assert out.min() == 0 and out.max() == 255
+
+
+def test_auto_levels_small_roi():
+    lut = DisplayLUT('linear', auto_levels=True, percentiles=(0, 100))
+    lut.set_bit_depth(12)
+    frame = np.arange(100, 124, dtype=np.uint16).reshape((4, 6))
+    out = np.zeros(frame.shape, dtype=np.uint8)
+    lut.convert(frame, out=out)
+    assert lut.levels == (100, 123)
+    assert out[0, 0] == 0 and out[-1, -1] == 255
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from qtpy import QtCore
+
+from pymodaq_plugins_genicam.hardware.nodes import EInterfaceType
+from pymodaq_plugins_genicam.hardware.feature_writer import FeatureWriter
+
+
+class FakeFeature:
+    """A float node taking some time to be written"""
+
+    def __init__(self, write_time: float):
+        self.node = type('Node', (), {'principal_interface_type': EInterfaceType.intfIFloat.value})()
+        self.write_time = write_time
+        self.writes = []
+        self._value = 0.
+
+    def get_access_mode(self):
+        return 4  # RW
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        time.sleep(self.write_time)
+        self.writes.append(value)
+        self._value = value
+
+
+class FakeController:
+    def __init__(self, feature: FakeFeature):
+        node_map = type('NodeMap', (), {'get_node': lambda self, name: feature})()
+        self.remote_device = type('RemoteDevice', (), {'node_map': node_map})()
+
+    def is_acquiring(self):
+        return False
+
+
+def test_requests_are_coalesced(qapp):
+    feature = FakeFeature(write_time=0.05)
+    writer = FeatureWriter(FakeController(feature))
+    reports = []
+    lock = threading.Lock()
+
+    def report(name, value):
+        with lock:
+            reports.append((name, value))
+
+    writer.value_set.connect(report, QtCore.Qt.DirectConnection)
+    writer.start()
+    try:
+        for ind in range(20):
+            writer.request('ExposureTime', float(ind))
+        start = time.perf_counter()
+        while len(reports) == 0 and time.perf_counter() - start < 5:
+            time.sleep(0.01)
+        time.sleep(0.2)  # no other write nor report should come
+    finally:
+        writer.quit()
+
+    assert feature.writes[-1] == 19.
+    assert len(feature.writes) <= 3  # last value wins over the pending ones
+    assert reports == [('ExposureTime', 19.)]  # superseded writes are not reported
@@ -0,0 +1,47 @@
+import numpy as np
+from qtpy import QtCore, QtWidgets
+
+from pymodaq.utils import gui_utils as gutils
+from pymodaq.control_modules.daq_viewer_ui.viewer_selector import SelectedModule
+
+from pymodaq_plugins_genicam.extensions.genicam_dashboard import GenICamDashboard
+from pymodaq_plugins_genicam.hardware.preview import preview_hub
+
+
+def test_dashboard_extension(qapp):
+    mainwindow = QtWidgets.QMainWindow()
+    dockarea = gutils.DockArea()
+    mainwindow.setCentralWidget(dockarea)
+
+    extension = GenICamDashboard(dockarea, None)
+    assert extension.get_genicam_detectors() == []
+    extension.enable_previews()  # no dashboard, nothing to enable
+
+    preview_hub.preview_ready.emit('cam', dict(image=np.zeros((4, 6), dtype=np.uint8),
+                                               histogram=np.ones((8,)), bin_edges=np.linspace(0, 1, 9),
+                                               fps=10., frames=3, dropped=0))
+    assert list(extension.tiles) == ['cam']
+    preview_hub.preview_ready.disconnect(extension.show_preview)
+
+
+def test_dashboard_extension_modules_manager(qapp):
+    dashboard = type('DashBoard', (), {'detector_modules': [], 'actuators_modules': [],
+                                       'experiment_manager': None})()
+    extension = GenICamDashboard(gutils.DockArea(), dashboard)
+    assert extension.modules_manager is not None
+    assert extension.get_genicam_detectors() == []
+    preview_hub.preview_ready.disconnect(extension.show_preview)
+
+
+def test_dashboard_finds_genicam_detectors(qapp):
+    detectors = []
+    for title, module_name in [('cam', 'GenICam'), ('mock', 'Mock')]:
+        detector = QtCore.QObject()
+        detector.title = title
+        detector.detector = SelectedModule('DAQ2D', module_name)
+        detectors.append(detector)
+    dashboard = type('DashBoard', (), {'detector_modules': detectors, 'actuators_modules': [],
+                                       'experiment_manager': None})()
+    extension = GenICamDashboard(gutils.DockArea(), dashboard)
+    assert [det.title for det in extension.get_genicam_detectors()] == ['cam']
+    preview_hub.preview_ready.disconnect(extension.show_preview)
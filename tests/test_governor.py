@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from pymodaq_plugins_genicam.hardware.governor import FrameRateGovernor
+
+
+class FakeNode:
+    def __init__(self, value, min=0., max=1000.):
+        self.value = value
+        self.min = min
+        self.max = max
+
+    def get_access_mode(self):
+        return 4  # RW
+
+
+class FakeController:
+    num_filled_buffers_to_hold = 1
+    num_holding_filled_buffers = 0
+
+    def __init__(self, enable: bool = False, with_enable: bool = True):
+        nodes = {'AcquisitionFrameRate': FakeNode(100.)}
+        if with_enable:
+            nodes['AcquisitionFrameRateEnable'] = FakeNode(enable)
+        node_map = type('NodeMap', (), {'get_node': lambda self, name: nodes[name]})()
+        self.remote_device = type('RemoteDevice', (), {'node_map': node_map})()
+        self.nodes = nodes
+
+
+def test_governor_limits_and_releases():
+    controller = FakeController()
+    governor = FrameRateGovernor(controller, headroom=0.8)
+    for _ in range(10):
+        governor.frame_processed(0.02)  # 50 frames per second at most
+    time.sleep(0.1)  # 10 frames in 0.1 s: the pipeline keeps up with 100 Hz
+    assert governor.update({}) == 40.
+    assert controller.nodes['AcquisitionFrameRateEnable'].value
+    assert controller.nodes['AcquisitionFrameRate'].value == 40.
+
+    governor.release()
+    assert not controller.nodes['AcquisitionFrameRateEnable'].value
+    assert controller.nodes['AcquisitionFrameRate'].value == 100.
+
+
+@pytest.mark.parametrize('enable, with_enable', [(True, True), (None, False)])
+def test_governor_restores_frame_rate(enable, with_enable):
+    controller = FakeController(enable, with_enable)
+    governor = FrameRateGovernor(controller, headroom=0.8)
+    for _ in range(10):
+        governor.frame_processed(0.02)
+    time.sleep(0.1)
+    governor.update({})
+    assert controller.nodes['AcquisitionFrameRate'].value == 40.
+
+    governor.release()
+    assert controller.nodes['AcquisitionFrameRate'].value == 100.
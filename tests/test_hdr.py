@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from pymodaq_plugins_genicam.hardware.hdr import HDRMerger, ExposureBracket, parse_exposures
+
+
+def test_parse_exposures():
+    assert parse_exposures('1000, 100;10000,') == [100., 1000., 10000.]
+    with pytest.raises(ValueError):
+        parse_exposures('0, 100')
+
+
+def test_merge_recovers_radiance():
+    exposures = [10., 100., 1000.]
+    radiance = np.array([[0.1, 1., 10., 100.]], dtype=np.float32)  # counts per unit exposure
+    merger = HDRMerger(exposures, saturation=4095)
+    merger.allocate(radiance.shape)
+    for _ in range(2):  # accumulators are reset after each merge
+        for index, exposure in enumerate(exposures):
+            merger.add(np.minimum(radiance * exposure, 4095).astype(np.uint16), index)
+        merged = merger.merge()
+        assert merged.dtype == np.float32
+        assert merged == pytest.approx(radiance, rel=0.05)
+
+
+class FakeNode:
+    def __init__(self, name: str, triggers: list, value=None):
+        self.name = name
+        self.value = value
+        self.triggers = triggers
+
+    def execute(self):
+        self.triggers.append(self.value)
+
+
+class FakeController:
+    """Camera without sequencer, recording the exposure time of each software trigger"""
+    def __init__(self):
+        self.triggers = []
+        self.nodes = {name: FakeNode(name, self.triggers, value) for name, value in
+                      [('ExposureAuto', 'Continuous'), ('ExposureTime', 500.),
+                       ('TriggerSelector', 'AcquisitionStart'), ('TriggerSource', 'Line1'),
+                       ('TriggerMode', 'On'), ('TriggerSoftware', None)]}
+
+        def get_node(name):
+            if name.startswith('Sequencer'):
+                raise AttributeError(name)
+            if name == 'TriggerSoftware':
+                self.nodes[name].value = self.nodes['ExposureTime'].value
+            return self.nodes[name]
+        node_map = type('NodeMap', (), {'get_node': staticmethod(get_node)})()
+        self.remote_device = type('RemoteDevice', (), {'node_map': node_map})()
+
+
+def test_bracket_retriggers_pending_frame():
+    controller = FakeController()
+    bracket = ExposureBracket(controller, [10., 100., 1000.], timeout=0.5)
+    assert bracket.configure() == 'software'
+    bracket.start()
+    assert bracket.next() == 0
+    bracket.retrigger()  # the frame at 100 µs was lost
+    assert bracket.get_timeout() == 500
+    assert bracket.next() == 1
+    assert controller.triggers == [10., 100., 100., 1000.]
+
+
+def test_bracket_restores_triggers():
+    controller = FakeController()
+    bracket = ExposureBracket(controller, [10., 100.])
+    bracket.configure()
+    assert controller.nodes['TriggerSource'].value == 'Software'
+    bracket.restore()
+    assert {name: node.value for name, node in controller.nodes.items() if name != 'TriggerSoftware'} == \
+        {'ExposureAuto': 'Continuous', 'ExposureTime': 500., 'TriggerSelector': 'AcquisitionStart',
+         'TriggerSource': 'Line1', 'TriggerMode': 'On'}
@@ -0,0 +1,90 @@
+from pymodaq_plugins_genicam.daq_move_plugins.daq_move_GenICam import DAQ_Move_GenICam
+from pymodaq_plugins_genicam.hardware.nodes import EAccessMode, EInterfaceType
+
+
+class FakeFeature:
+    """Integer node whose device only accepts multiples of 4 below 1000"""
+    def __init__(self, name: str):
+        self.node = type('Node', (), {'name': name,
+                                      'principal_interface_type': EInterfaceType.intfIInteger.value})()
+        self.unit = 'dB'
+        self.min = 0
+        self.max = 1000
+        self.inc = 4
+        self._value = 12
+
+    def get_access_mode(self):
+        return EAccessMode.RW.value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = min(value, 996)
+
+
+class FakeSelector:
+    def __init__(self, value: str):
+        self.value = value
+        self.writes = []
+
+    def to_string(self):
+        return self.value
+
+    def from_string(self, value: str):
+        self.writes.append(value)
+        self.value = value
+
+
+class FakeController:
+    def __init__(self):
+        self.nodes = {'Gain': FakeFeature('Gain'), 'GainSelector': FakeSelector('All')}
+        node_map = type('NodeMap', (), {'get_node': lambda _, name: self.nodes[name]})()
+        self.remote_device = type('RemoteDevice', (), {'node_map': node_map})()
+
+    def is_acquiring(self):
+        return True
+
+
+def get_plugin(qapp) -> DAQ_Move_GenICam:
+    plugin = DAQ_Move_GenICam(None, None)
+    plugin.controller = FakeController()
+    plugin.settings.child('feature').setValue('Gain')
+    plugin.settings.child('selector').setValue('GainSelector')
+    plugin.settings.child('selector_value').setValue('All')
+    plugin.set_feature_limits()
+    return plugin
+
+
+def test_feature_limits_from_node(qapp):
+    plugin = get_plugin(qapp)
+    assert plugin.settings.child('units').value() == 'dB'
+    assert plugin.settings.child('bounds', 'min_bound').value() == 0
+    assert plugin.settings.child('bounds', 'max_bound').value() == 1000
+    assert plugin.settings.child('bounds', 'is_bounds').value()
+    assert plugin.settings.child('epsilon').value() == 2
+    assert plugin.home_value == 12
+
+
+def test_write_targets_coerced_readback(qapp):
+    plugin = get_plugin(qapp)
+    plugin.write(10)  # coerced to the increment
+    assert plugin.target_value.value() == 8
+    plugin.write(999)  # coerced by the device
+    assert plugin.target_value.value() == 996
+    assert plugin.get_actuator_value().value() == 996
+
+
+def test_selector_written_only_when_changed(qapp):
+    plugin = get_plugin(qapp)
+    selector = plugin.controller.nodes['GainSelector']
+    for _ in range(3):
+        plugin.get_actuator_value()
+        plugin.write(20)
+    assert selector.writes == []
+
+    selector.value = 'Red'  # changed by another module
+    plugin.write(20)
+    assert selector.writes == ['All']
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from pymodaq_plugins_genicam.hardware.scan_sync import FramePositionMapper
+
+
+def test_counter_mode():
+    mapper = FramePositionMapper(np.linspace(0, 9, 10), mode='counter')
+    assert mapper.map(frame_id=12) == 0
+    assert mapper.map(frame_id=13) == 1
+    assert mapper.map(frame_id=15) == 3  # frame 14 has been lost
+    assert mapper.map(frame_id=30) is None
+    assert mapper.n_missing == 7
+    assert not mapper.is_complete(frame_id=15)
+    assert mapper.is_complete(frame_id=21)
+
+
+def test_timestamp_mode():
+    mapper = FramePositionMapper(np.linspace(0, 1, 11), mode='timestamp', velocity=10.)
+    assert mapper.map(timestamp_ns=1_000_000_000) == 0
+    assert mapper.map(timestamp_ns=1_010_000_000) == 1
+    assert mapper.map(timestamp_ns=1_050_000_000) == 5
+    assert mapper.is_complete(timestamp_ns=1_100_000_000)
+    assert mapper.frame_period == pytest.approx(0.01)
+
+    mapper.reset()
+    assert mapper.n_missing == 11
+    assert mapper.map(timestamp_ns=5) == 0
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        FramePositionMapper(np.linspace(0, 1, 11), mode='encoder')
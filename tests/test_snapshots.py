@@ -0,0 +1,54 @@
+from pymodaq_plugins_genicam.hardware.nodes import EInterfaceType
+from pymodaq_plugins_genicam.hardware import snapshots
+
+INT = EInterfaceType.intfIInteger.value
+ENUM = EInterfaceType.intfIEnumeration.value
+
+
+class FakeNode:
+    def __init__(self, node_map, name, value):
+        self.node_map = node_map
+        self.name = name
+        self.value = value
+
+    def to_string(self):
+        return str(self.value)
+
+    def from_string(self, value):
+        if self.name == 'Width' and int(value) + self.node_map['OffsetX'].value > 100:
+            raise ValueError('out of range')
+        self.value = int(value)
+        self.node_map.n_writes += 1
+
+
+class FakeNodeMap(dict):
+    n_writes = 0
+
+    def get_node(self, name):
+        return self[name]
+
+
+class FakeController:
+    def __init__(self, node_map):
+        self.remote_device = type('RemoteDevice', (), {'node_map': node_map})()
+
+
+def test_sort_features():
+    features = [('ExposureTime', EInterfaceType.intfIFloat.value, '10'), ('ExposureAuto', ENUM, 'Off'),
+                ('Width', INT, '10'), ('PixelFormat', ENUM, 'Mono12'), ('GainSelector', ENUM, 'All')]
+    assert [name for name, _, _ in snapshots.sort_features(features)] == \
+           ['GainSelector', 'PixelFormat', 'ExposureAuto', 'ExposureTime', 'Width']
+
+
+def test_batch_write_retries_dependencies():
+    node_map = FakeNodeMap()
+    for name, value in [('Width', 50), ('OffsetX', 50), ('Height', 20)]:
+        node_map[name] = FakeNode(node_map, name, value)
+    controller = FakeController(node_map)
+
+    # width cannot grow before the offset is decreased: written in a second pass
+    n_failed = snapshots.batch_write(controller, [('Width', INT, '100'), ('OffsetX', INT, '0'),
+                                                  ('Height', INT, '20')])
+    assert n_failed == 0
+    assert node_map['Width'].value == 100 and node_map['OffsetX'].value == 0
+    assert node_map.n_writes == 2  # unchanged values are not written
@@ -0,0 +1,78 @@
+from pymodaq_plugins_genicam.hardware import transport
+
+
+class FakeNode:
+    def __init__(self, value, min=0, max=0, inc=1):
+        self.value = value
+        self.min = min
+        self.max = max
+        self.inc = inc
+
+
+class FakeController:
+    """A GigE camera behind a network path with a given MTU"""
+
+    def __init__(self, mtu: int, trigger_mode: str = 'Off'):
+        self.mtu = mtu
+        self.n_grabs = 0
+        self.nodes = {'GevSCPSPacketSize': FakeNode(2000, min=576, max=9000, inc=4),
+                      'GevSCPSDoNotFragment': FakeNode(False),
+                      'TriggerMode': FakeNode(trigger_mode)}
+        node_map = type('NodeMap', (), {'get_node': lambda _, name: self.nodes[name]})()
+        self.remote_device = type('RemoteDevice', (), {'node_map': node_map})()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def try_fetch(self, timeout: float):
+        self.n_grabs += 1
+        if self.nodes['TriggerMode'].value == 'On' or self.nodes['GevSCPSPacketSize'].value > self.mtu:
+            return None
+        return type('Buffer', (), {'queue': lambda _: None})()
+
+
+def test_probe_packet_size():
+    controller = FakeController(mtu=4000)
+    assert transport.probe_packet_size(controller) == 4000
+    assert controller.nodes['GevSCPSDoNotFragment'].value
+    assert controller.n_grabs <= 4
+
+    controller = FakeController(mtu=1500)
+    assert transport.probe_packet_size(controller) == 1500
+
+
+def test_probe_keeps_packet_size_when_no_frame():
+    controller = FakeController(mtu=9000, trigger_mode='On')
+    assert transport.probe_packet_size(controller) is None
+    assert controller.nodes['GevSCPSPacketSize'].value == 2000
+    assert controller.n_grabs == 0
+
+    controller = FakeController(mtu=1000)  # nothing gets through
+    assert transport.probe_packet_size(controller) is None
+    assert controller.nodes['GevSCPSPacketSize'].value == 2000
+    assert controller.n_grabs == 1
+
+
+class FakeAcquirer:
+    """Keeps a single callback per event, as harvesters does"""
+
+    def __init__(self):
+        self.data_streams = []
+        self.callbacks = {}
+
+    def add_callback(self, event, callback):
+        self.callbacks[event] = callback
+
+
+def test_stream_statistics_incomplete_listeners():
+    controller = FakeAcquirer()
+    statistics = transport.StreamStatistics(controller)
+    events = []
+    statistics.add_listener(type('Listener', (), {'emit': lambda _, context: events.append(context)})())
+
+    controller.callbacks[transport.ImageAcquirer.Events.INCOMPLETE_BUFFER].emit(None)
+    assert statistics.get()['incomplete'] == 1
+    assert events == [None]
@@ -0,0 +1,197 @@
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+from qtpy import QtCore
+
+from pymodaq_plugins_genicam.daq_viewer_plugins.plugins_2D.daq_2Dviewer_GenICam import DAQ_2DViewer_GenICam, \
+    FRAME_RING_SIZE
+
+
+class FakeComponent:
+    def __init__(self, data: np.ndarray, data_format: str):
+        self.data = data.ravel()
+        self.height, self.width = data.shape
+        self.data_format = data_format
+        self.num_components_per_pixel = 1
+
+
+class FakeNode:
+    def __init__(self, name: str, writes: list, value=None):
+        self.name = name
+        self._value = value
+        self.writes = writes
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self.writes.append((self.name, value))
+        self._value = value
+
+
+class FakeController:
+    def __init__(self, frames: list, data_format: str = 'Mono12'):
+        self.frames = frames
+        self.data_format = data_format
+        self.frame_id = 0
+        self.writes = []
+        self.acquiring = False
+        nodes = {}
+
+        def get_node(name):
+            if name not in nodes:
+                nodes[name] = FakeNode(name, self.writes, data_format)
+            return nodes[name]
+        node_map = type('NodeMap', (), {'get_node': staticmethod(get_node)})()
+        self.remote_device = type('RemoteDevice', (), {'node_map': node_map})()
+
+    def is_acquiring(self):
+        return self.acquiring
+
+    def stop(self):
+        self.acquiring = False
+
+    @contextmanager
+    def fetch(self):
+        self.frame_id += 1
+        payload = type('Payload', (), {'components': [FakeComponent(self.frames.pop(0), self.data_format)]})()
+        yield type('Buffer', (), {'payload': payload, 'frame_id': self.frame_id,
+                                  'timestamp_ns': self.frame_id * 1000})()
+
+
+def test_frames_exported_through_queued_connection(qapp):
+    plugin = DAQ_2DViewer_GenICam(None, None)
+    frames = [np.full((6, 8), ind, dtype=np.uint16) for ind in range(FRAME_RING_SIZE + 1)]
+    plugin.controller = FakeController(list(frames))
+    emitted = []
+    plugin.dte_signal.connect(lambda dte: emitted.append(dte), QtCore.Qt.QueuedConnection)
+
+    plugin.emit_data()
+    buffer = plugin.data
+    for _ in range(FRAME_RING_SIZE - 1):
+        time.sleep(0.01)
+        plugin.emit_data()
+    QtCore.QCoreApplication.processEvents()  # the GUI gets the frames late
+
+    assert len(emitted) == FRAME_RING_SIZE
+    assert [np.array_equal(dte[0][0], frame) for dte, frame in zip(emitted, frames)] == [True] * FRAME_RING_SIZE
+    timestamps = [dte.timestamp for dte in emitted]
+    assert timestamps == sorted(timestamps) and len(set(timestamps)) == FRAME_RING_SIZE
+    assert [dte[0].timestamp for dte in emitted] == sorted(dte[0].timestamp for dte in emitted)
+
+    plugin.emit_data()
+    assert plugin.data is buffer  # the buffers of the ring are allocated once per geometry
+    assert buffer.dtype == np.uint16  # full precision, no float conversion
+
+
+def test_disabled_scan_keeps_user_triggers(qapp):
+    plugin = DAQ_2DViewer_GenICam(None, None)
+    plugin.controller = FakeController([])
+    plugin.set_hardware_scan()
+    assert plugin.controller.writes == []  # trigger settings made in Cam. Prop. are kept
+
+    plugin.settings.child('hw_scan', 'hw_scan_enabled').setValue(True)
+    plugin.set_hardware_scan()
+    assert ('TriggerMode', 'On') in plugin.controller.writes
+    plugin.controller.writes.clear()
+    plugin.settings.child('hw_scan', 'hw_scan_enabled').setValue(False)
+    plugin.set_hardware_scan()
+    assert ('TriggerMode', 'Off') in plugin.controller.writes
+
+
+def test_scan_with_lost_last_frame_ends_on_timeout(qapp):
+    plugin = DAQ_2DViewer_GenICam(None, None)
+    plugin.controller = FakeController([np.full((4, 6), ind, dtype=np.uint16) for ind in range(2)])
+    plugin.settings.child('hw_scan', 'hw_scan_enabled').setValue(True)
+    plugin.settings.child('hw_scan', 'scan_npts').setValue(3)
+    plugin.set_hardware_scan()
+    plugin.height, plugin.width = 4, 6
+    plugin.scan_data = np.zeros((3, 4, 6), dtype=np.uint16)
+    plugin.controller.acquiring = True
+    emitted = []
+    plugin.dte_signal.connect(emitted.append, QtCore.Qt.DirectConnection)
+
+    plugin.emit_data()
+    plugin.emit_data()  # the frame of the last position is lost
+    assert emitted == []
+    plugin.end_scan()  # called by the watchdog
+
+    assert not plugin.controller.acquiring
+    assert len(emitted) == 1 and emitted[0][0].shape == (3, 4, 6)
+    assert plugin.settings.child('hw_scan', 'scan_missing').value() == 1
+
+
+def test_analysis_exported_with_frames(qapp):
+    plugin = DAQ_2DViewer_GenICam(None, None)
+    frames = []
+    for ind in range(6):
+        frame = np.zeros((4, 6), dtype=np.uint16)
+        frame[1, ind] = 100
+        frames.append(frame)
+    plugin.controller = FakeController(frames)
+    plugin.settings.child('analysis', 'analysis_workers').setValue(1)
+    plugin.settings.child('analysis', 'analysis_policy').setValue('block')
+    plugin.settings.child('analysis', 'analysis_enabled').setValue(True)
+    plugin.set_analysis()
+    emitted = []
+    plugin.dte_signal.connect(emitted.append, QtCore.Qt.DirectConnection)
+    try:
+        for _ in range(5):
+            plugin.emit_data()
+        time.sleep(3)  # let the workers start and process the frames
+        plugin.emit_data()
+    finally:
+        plugin.analysis_pipeline.close()
+
+    # a single export per frame, always with the same layout
+    assert len(emitted) == 6
+    assert [[dwa.dim.name for dwa in dte] for dte in emitted] == [['Data2D', 'Data0D']] * 6
+    assert emitted[0].get_data_from_name('Analysis').labels == ['x', 'y', 'amplitude', 'frame']
+    x, y, amplitude, frame_id = [array[0] for array in emitted[-1].get_data_from_name('Analysis')]
+    assert frame_id >= 1 and (x, y, amplitude) == (frame_id - 1, 1., 100.)
+
+
+class FakeIntNode:
+    def __init__(self, nodes: dict, name: str, value: int):
+        self.nodes = nodes
+        self.name = name
+        self.value = value
+
+    @property
+    def max(self):  # the maximum size shrinks with the offset on some devices only
+        if self.name not in ['Width', 'Height']:
+            return 10000
+        size_max = self.nodes[f'{self.name}Max'].value
+        if self.nodes['shrinking']:
+            return size_max - self.nodes[f'Offset{"X" if self.name == "Width" else "Y"}'].value
+        return size_max
+
+    def to_string(self):
+        return str(self.value)
+
+    def from_string(self, value: str):
+        if int(value) > self.max:
+            raise ValueError(f'{self.name} out of range')
+        self.value = int(value)
+
+
+@pytest.mark.parametrize('shrinking, sfnc_max', [(False, True), (True, True), (True, False)])
+def test_full_frame(qapp, shrinking, sfnc_max):
+    plugin = DAQ_2DViewer_GenICam(None, None)
+    plugin.controller = FakeController([])
+    nodes = {'shrinking': shrinking}
+    for name, value in [('WidthMax', 640), ('HeightMax', 480), ('OffsetX', 100), ('OffsetY', 40),
+                        ('Width', 200), ('Height', 100)]:
+        nodes[name] = FakeIntNode(nodes, name, value)
+
+    def get_node(name):
+        if not sfnc_max and name in ['WidthMax', 'HeightMax']:
+            raise AttributeError(name)
+        return nodes[name]
+    plugin.controller.remote_device.node_map = type('NodeMap', (), {'get_node': staticmethod(get_node)})()
+    plugin.set_full_frame()
+    assert [nodes[name].value for name in ['OffsetX', 'OffsetY', 'Width', 'Height']] == [0, 0, 640, 480]